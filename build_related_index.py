@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Related Pages Index Builder
+Sparse TF-IDF over page text and commentary with blocked top-k neighbour search
+Uses only built-in Python libraries - no external dependencies
+"""
+
+import argparse
+import heapq
+import json
+import math
+import re
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from page_model import PageStore
+
+# ============================================================================
+# TOKENISATION
+# ============================================================================
+
+STOPWORDS = frozenset("""
+a about above after again against all also although am an and any are as at be because been before
+being below between both but by can could did do does doing down during each even few for from
+further had has have having he her here hers him his how however i if in into is it its itself just
+may might more most much must my no nor not now of off on once only or other our out over own page
+same she should so some such than that the their them then there these they this those through to
+too under until up upon very was we were what when where whether which while who whom why will with
+within without would yet you your diamond diamond's book chapter argues shows establishes
+""".split())
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z'-]{2,}")
+
+# Key Concepts carry the vocabulary readers follow between pages
+FIELD_WEIGHTS = {
+    'raw': 1.0,
+    'commentary': 1.0,
+    'key_concepts': 2.0,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        token.strip("'-") for token in TOKEN_PATTERN.findall(text.lower())
+        if token.strip("'-") not in STOPWORDS
+    ]
+
+# ============================================================================
+# SPARSE MATRICES
+# ============================================================================
+
+class SparseMatrix:
+    """Compressed sparse rows held in typed arrays (indptr / indices / data)"""
+
+    def __init__(self, n_cols: int):
+        self.n_cols = n_cols
+        self.indptr = array('l', [0])
+        self.indices = array('l')
+        self.data = array('d')
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def append_row(self, row: Dict[int, float]):
+        for col in sorted(row):
+            self.indices.append(col)
+            self.data.append(row[col])
+        self.indptr.append(len(self.indices))
+
+    def transpose(self) -> 'SparseMatrix':
+        """Column-major copy (term → postings) for sparse products"""
+        counts = [0] * self.n_cols
+        for col in self.indices:
+            counts[col] += 1
+
+        result = SparseMatrix(self.n_rows)
+        offset = 0
+        for count in counts:
+            offset += count
+            result.indptr.append(offset)
+        result.indices = array('l', [0]) * offset
+        result.data = array('d', [0.0]) * offset
+
+        cursor = list(result.indptr[:-1])
+        for row in range(self.n_rows):
+            for k in range(self.indptr[row], self.indptr[row + 1]):
+                col = self.indices[k]
+                result.indices[cursor[col]] = row
+                result.data[cursor[col]] = self.data[k]
+                cursor[col] += 1
+        return result
+
+
+def build_tfidf(documents: List[Dict[str, float]], max_df: float) -> Tuple[SparseMatrix, List[str]]:
+    """L2-normalised sublinear TF-IDF rows; terms in more than max_df of pages are dropped"""
+    n_docs = len(documents)
+    df: Dict[str, int] = {}
+    for doc in documents:
+        for term in doc:
+            df[term] = df.get(term, 0) + 1
+
+    df_limit = max(2, int(max_df * n_docs))
+    vocabulary = sorted(term for term, count in df.items() if 2 <= count <= df_limit)
+    term_index = {term: i for i, term in enumerate(vocabulary)}
+    idf = [math.log((1 + n_docs) / (1 + df[term])) + 1 for term in vocabulary]
+
+    matrix = SparseMatrix(len(vocabulary))
+    for doc in documents:
+        row = {}
+        for term, tf in doc.items():
+            col = term_index.get(term)
+            if col is not None:
+                row[col] = (1 + math.log(tf)) * idf[col]
+        norm = math.sqrt(sum(v * v for v in row.values())) or 1.0
+        matrix.append_row({col: v / norm for col, v in row.items()})
+    return matrix, vocabulary
+
+# ============================================================================
+# BLOCKED TOP-K SEARCH
+# ============================================================================
+
+def top_k_neighbors(matrix: SparseMatrix, k: int, memory_mb: float) -> List[List[Tuple[int, float]]]:
+    """Top-k cosine neighbours of every row via blocked X · Xᵀ
+
+    Rows are processed in blocks whose dense score buffers fit in memory_mb.
+    Each block's scores are accumulated term by term through the postings
+    of the transposed matrix, so work follows the non-zeros, not n².
+    """
+    n = matrix.n_rows
+    postings = matrix.transpose()
+    block_rows = max(1, int(memory_mb * 1024 * 1024 // (8 * max(n, 1))))
+    neighbors: List[List[Tuple[int, float]]] = []
+
+    for block_start in range(0, n, block_rows):
+        block_end = min(n, block_start + block_rows)
+        scores = [array('d', bytes(8 * n)) for _ in range(block_end - block_start)]
+
+        for local, row in enumerate(range(block_start, block_end)):
+            acc = scores[local]
+            for k_idx in range(matrix.indptr[row], matrix.indptr[row + 1]):
+                col = matrix.indices[k_idx]
+                weight = matrix.data[k_idx]
+                for p in range(postings.indptr[col], postings.indptr[col + 1]):
+                    acc[postings.indices[p]] += weight * postings.data[p]
+            acc[row] = 0.0  # a page is not its own neighbour
+
+        for local in range(block_end - block_start):
+            acc = scores[local]
+            best = heapq.nlargest(k, ((score, doc) for doc, score in enumerate(acc) if score > 0))
+            neighbors.append([(doc, score) for score, doc in best])
+
+    return neighbors
+
+# ============================================================================
+# CORPUS
+# ============================================================================
+
+def load_documents(text_dir: str, raw_dir: str) -> Tuple[List[int], List[Dict[str, float]], Dict[int, str]]:
+    """Weighted term counts and a short label for every page"""
+    pages = PageStore(text_dir).load('en')
+    numbers, documents, labels = [], [], {}
+
+    for page in pages:
+        counts: Dict[str, float] = {}
+
+        raw_path = Path(raw_dir) / f'page_{page.number:04d}.txt'
+        raw_text = raw_path.read_text(encoding='utf-8') if raw_path.exists() else page.original_text
+        fields = [('raw', raw_text)]
+        for section in page.commentary:
+            field = 'key_concepts' if section.title == 'Key Concepts' else 'commentary'
+            fields.append((field, section.text))
+
+        for field, text in fields:
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0.0) + weight
+
+        numbers.append(page.number)
+        documents.append(counts)
+
+        summary = page.section('Summary')
+        label = (summary.text if summary else page.original_text).split('. ')[0]
+        labels[page.number] = label if len(label) <= 80 else label[:77].rstrip() + '…'
+
+    return numbers, documents, labels
+
+
+def build_index(text_dir: str, raw_dir: str, k: int, max_df: float, memory_mb: float, min_score: float) -> Dict:
+    numbers, documents, labels = load_documents(text_dir, raw_dir)
+    matrix, vocabulary = build_tfidf(documents, max_df)
+    neighbors = top_k_neighbors(matrix, k, memory_mb)
+
+    index = {'version': 1, 'k': k, 'neighbors': {}, 'labels': {}}
+    referenced = set()
+    for row, page_neighbors in enumerate(neighbors):
+        kept = [
+            [numbers[doc], int(round(score * 1000))]
+            for doc, score in page_neighbors if score >= min_score
+        ]
+        if kept:
+            index['neighbors'][str(numbers[row])] = kept
+            referenced.update(page for page, _ in kept)
+    index['labels'] = {str(page): labels[page] for page in sorted(referenced)}
+    index['stats'] = {'pages': len(numbers), 'terms': len(vocabulary), 'nonzeros': len(matrix.data)}
+    return index
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the related-pages neighbour index')
+    parser.add_argument('--k', type=int, default=5, help='Neighbours kept per page')
+    parser.add_argument('--max-df', type=float, default=0.5, help='Drop terms found on more than this share of pages')
+    parser.add_argument('--memory-mb', type=float, default=64.0, help='Cap for dense score buffers per block')
+    parser.add_argument('--min-score', type=float, default=0.05, help='Minimum cosine similarity to keep')
+    parser.add_argument('--output', default='related_pages.json', help='Output index path')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_index('text', 'text_raw', args.k, args.max_df, args.memory_mb, args.min_score)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+    stats = index['stats']
+    print(f"🔗 Related pages: {stats['pages']} pages, {stats['terms']} terms, "
+          f"{stats['nonzeros']} non-zeros → {args.output} ({time.perf_counter() - start:.1f}s)")
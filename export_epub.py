@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming EPUB Export
+Packs page text, commentary and optional scans into an EPUB 3 book for e-readers
+Uses only built-in Python libraries - no external dependencies
+"""
+
+import argparse
+import json
+import os
+import struct
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from html import escape
+from pathlib import Path
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from page_delta import translated_page_exists
+from page_model import Page, PageStore
+
+# ============================================================================
+# STREAMING ZIP WRITER
+# ============================================================================
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+ZIP_VERSION = 20
+ZIP_UTF8_FLAG = 0x0800
+ZIP_MAX_OFFSET = 0xFFFFFFFF
+
+
+class CompressedEntry(NamedTuple):
+    name: str
+    method: int
+    crc: int
+    size: int
+    data: bytes
+
+
+class EntrySpec(NamedTuple):
+    """An archive member whose bytes are produced lazily by load()"""
+    name: str
+    load: Callable[[], bytes]
+    method: int = ZIP_DEFLATED
+
+
+def compress_entry(spec: EntrySpec, level: int) -> CompressedEntry:
+    """Produce and compress one entry (runs on a worker thread)"""
+    raw = spec.load()
+    crc = zlib.crc32(raw)
+    if spec.method == ZIP_DEFLATED:
+        # Raw deflate stream (negative wbits), as the zip format expects
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        data = compressor.compress(raw) + compressor.flush()
+    else:
+        data = raw
+    return CompressedEntry(spec.name, spec.method, crc, len(raw), data)
+
+
+class StreamingZipWriter:
+    """Writes zip members sequentially to a file, central directory last
+
+    Entries arrive fully compressed, so sizes and CRCs go straight into
+    the local headers and nothing is ever seeked back over.
+    """
+
+    def __init__(self, path: Path, timestamp: Optional[float] = None):
+        self.file = open(path, 'wb')
+        self.offset = 0
+        self.central: List[bytes] = []
+        self.dos_time, self.dos_date = self._dos_datetime(timestamp or time.time())
+
+    @staticmethod
+    def _dos_datetime(timestamp: float) -> Tuple[int, int]:
+        t = time.localtime(timestamp)
+        dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+        dos_date = ((max(t.tm_year, 1980) - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+        return dos_time, dos_date
+
+    def write(self, entry: CompressedEntry):
+        if self.offset + len(entry.data) > ZIP_MAX_OFFSET:
+            raise ValueError('archive exceeds 4 GiB; zip64 is not supported')
+        name = entry.name.encode('utf-8')
+        header = struct.pack(
+            '<IHHHHHIIIHH', 0x04034B50, ZIP_VERSION, ZIP_UTF8_FLAG, entry.method,
+            self.dos_time, self.dos_date, entry.crc, len(entry.data), entry.size, len(name), 0,
+        )
+        self.central.append(struct.pack(
+            '<IHHHHHHIIIHHHHHII', 0x02014B50, ZIP_VERSION, ZIP_VERSION, ZIP_UTF8_FLAG,
+            entry.method, self.dos_time, self.dos_date, entry.crc, len(entry.data),
+            entry.size, len(name), 0, 0, 0, 0, 0, self.offset,
+        ) + name)
+        self.file.write(header)
+        self.file.write(name)
+        self.file.write(entry.data)
+        self.offset += len(header) + len(name) + len(entry.data)
+
+    def close(self):
+        directory = b''.join(self.central)
+        self.file.write(directory)
+        self.file.write(struct.pack(
+            '<IHHHHIIH', 0x06054B50, 0, 0, len(self.central), len(self.central),
+            len(directory), self.offset, 0,
+        ))
+        self.file.close()
+
+
+def write_archive(path: Path, specs: Iterator[EntrySpec], workers: int, window: int,
+                  level: int = 9) -> Tuple[int, int]:
+    """Compress entries on a thread pool and write them in input order
+
+    At most `window` entries are in flight, so memory stays bounded to a
+    handful of pages however long the book is. zlib releases the GIL while
+    compressing, so threads scale across cores. Returns (entries, bytes).
+    """
+    writer = StreamingZipWriter(path)
+    pending = deque()
+    count = 0
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for spec in specs:
+                pending.append(pool.submit(compress_entry, spec, level))
+                if len(pending) >= window:
+                    writer.write(pending.popleft().result())
+                    count += 1
+            while pending:
+                writer.write(pending.popleft().result())
+                count += 1
+    finally:
+        writer.close()
+    return count, writer.offset
+
+# ============================================================================
+# EPUB CONTENT
+# ============================================================================
+
+LABELS = {
+    'en': {
+        'original': 'Original Content',
+        'commentary': 'Educational Analysis',
+        'page': 'Page',
+        'contents': 'Contents',
+        'scan': 'Scanned page',
+    },
+    'ro': {
+        'original': 'Conținut Original',
+        'commentary': 'Analiză Educațională',
+        'page': 'Pagina',
+        'contents': 'Cuprins',
+        'scan': 'Pagina scanată',
+    },
+}
+
+STYLESHEET = """body { font-family: Georgia, serif; line-height: 1.5; margin: 0 4%; }
+h1 { font-size: 1.2em; text-align: center; margin: 1em 0; }
+h2 { font-size: 1.05em; border-bottom: 1px solid #ccc; margin-top: 1.5em; }
+h3 { font-size: 1em; margin-bottom: 0.2em; }
+p { margin: 0.3em 0; }
+.original p { text-indent: 0; }
+.commentary { font-size: 0.95em; }
+.scan { text-align: center; }
+.scan img { max-width: 100%; }
+nav ol { list-style: none; padding-left: 1em; }
+"""
+
+CONTAINER_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>
+"""
+
+
+# Directories holding each image tier
+IMAGE_TIERS = {
+    'original': 'pages',
+    'optimized': 'pages_optimized',
+}
+
+
+def page_xhtml_name(page_num: int) -> str:
+    return f'pages/page_{page_num:04d}.xhtml'
+
+
+def image_name(page_num: int) -> str:
+    return f'images/page_{page_num:04d}.png'
+
+
+class EpubBuilder:
+    """Describes every EPUB member as a lazily rendered EntrySpec"""
+
+    def __init__(self, language: str = 'en', text_dir: str = 'text', metadata_file: str = 'metadata.json',
+                 image_dir: Optional[str] = None, pages: Optional[List[int]] = None):
+        self.language = language
+        self.labels = LABELS[language]
+        self.image_dir = Path(image_dir) if image_dir else None
+        with open(metadata_file, 'r', encoding='utf-8') as f:
+            self.metadata = json.load(f)
+        total = self.metadata['book']['total_pages']
+        self.pages = pages or list(range(1, total + 1))
+
+        # Pages are parsed one at a time inside their render callables, so
+        # only the entries in the compression window are ever in memory
+        self.store = PageStore(text_dir)
+
+    def entries(self) -> Iterator[EntrySpec]:
+        # The mimetype must be first and stored uncompressed
+        yield EntrySpec('mimetype', lambda: b'application/epub+zip', ZIP_STORED)
+        yield EntrySpec('META-INF/container.xml', lambda: CONTAINER_XML.encode('utf-8'))
+        yield EntrySpec('OEBPS/content.opf', lambda: self.render_opf().encode('utf-8'))
+        yield EntrySpec('OEBPS/nav.xhtml', lambda: self.render_nav().encode('utf-8'))
+        yield EntrySpec('OEBPS/style.css', lambda: STYLESHEET.encode('utf-8'))
+        for page_num in self.pages:
+            yield EntrySpec(f'OEBPS/{page_xhtml_name(page_num)}',
+                            lambda n=page_num: self.render_page(n).encode('utf-8'))
+            if self.image_dir:
+                # PNGs are already deflated; storing them saves CPU for nothing lost
+                yield EntrySpec(f'OEBPS/{image_name(page_num)}',
+                                lambda n=page_num: self.read_image(n), ZIP_STORED)
+
+    # ------------------------------------------------------------------
+    # Pages
+    # ------------------------------------------------------------------
+
+    def untranslated(self) -> List[int]:
+        """Selected pages with no translation, which will fall back to English"""
+        if self.language == 'en':
+            return []
+        return [n for n in self.pages
+                if not translated_page_exists(self.store.text_dir, n, self.language)]
+
+    def page(self, page_num: int) -> Page:
+        # Same fallback as the reader: untranslated pages show in English
+        page = self.store.read_page(page_num, self.language) if self.language != 'en' else None
+        if page is None:
+            page = self.store.read_page(page_num)
+        if page is None:
+            raise FileNotFoundError(f'no text for page {page_num}')
+        return page
+
+    def read_image(self, page_num: int) -> bytes:
+        with open(self.image_dir / f'page_{page_num:04d}.png', 'rb') as f:
+            return f.read()
+
+    def render_page(self, page_num: int) -> str:
+        page = self.page(page_num)
+
+        title = f"{self.labels['page']} {page_num}"
+        body = [f'<h1>{title}</h1>']
+        if self.image_dir:
+            body.append(f'<div class="scan"><img src="../{image_name(page_num)}" '
+                        f'alt="{self.labels["scan"]} {page_num}"/></div>')
+        if page.paragraphs:
+            body.append(f'<section class="original"><h2>{self.labels["original"]}</h2>')
+            body.extend(f'<p>{escape(text, quote=False)}</p>' for text in page.paragraphs)
+            body.append('</section>')
+        if page.commentary:
+            body.append(f'<section class="commentary"><h2>{self.labels["commentary"]}</h2>')
+            for section in page.commentary:
+                body.append(f'<h3>{escape(section.title, quote=False)}</h3>')
+                body.extend(f'<p>{escape(text, quote=False)}</p>' for text in section.text.split('\n'))
+            body.append('</section>')
+        return self.xhtml(title, '\n'.join(body), stylesheet='../style.css')
+
+    def xhtml(self, title: str, body: str, stylesheet: str = 'style.css', extra_ns: str = '') -> str:
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml"{extra_ns} xml:lang="{self.language}" lang="{self.language}">
+<head>
+<meta charset="UTF-8"/>
+<title>{escape(title, quote=False)}</title>
+<link rel="stylesheet" type="text/css" href="{stylesheet}"/>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+    # ------------------------------------------------------------------
+    # Navigation and package document
+    # ------------------------------------------------------------------
+
+    def toc_entries(self) -> List[Tuple[str, int, List[Tuple[str, int]]]]:
+        """(title, start page, [(child title, start page)]) from metadata.json"""
+        structure = self.metadata['structure']
+        first, last = self.pages[0], self.pages[-1]
+        entries = []
+        for key in ('preface', 'prologue'):
+            if key in structure:
+                entries.append((structure[key]['title'], structure[key]['start_page'], []))
+        for part in structure.get('parts', []):
+            chapters = [(f"{chapter['number']}. {chapter['title']}", chapter['start_page'])
+                        for chapter in part.get('chapters', [])]
+            entries.append((part['title'], part['start_page'], chapters))
+        # Keep only targets that exist in a partial export
+        return [
+            (title, start, [(t, s) for t, s in children if first <= s <= last])
+            for title, start, children in entries if first <= start <= last
+        ]
+
+    def render_nav(self) -> str:
+        items = []
+        for title, start, children in self.toc_entries():
+            item = f'<li><a href="{page_xhtml_name(start)}">{escape(title, quote=False)}</a>'
+            if children:
+                item += '<ol>' + ''.join(
+                    f'<li><a href="{page_xhtml_name(s)}">{escape(t, quote=False)}</a></li>'
+                    for t, s in children
+                ) + '</ol>'
+            items.append(item + '</li>')
+        if not items:
+            items.append(f'<li><a href="{page_xhtml_name(self.pages[0])}">'
+                         f'{self.labels["page"]} {self.pages[0]}</a></li>')
+
+        body = (f'<nav epub:type="toc" id="toc"><h1>{self.labels["contents"]}</h1>'
+                f'<ol>{"".join(items)}</ol></nav>')
+        return self.xhtml(self.labels['contents'], body,
+                          extra_ns=' xmlns:epub="http://www.idpf.org/2007/ops"')
+
+    def render_opf(self) -> str:
+        book = self.metadata['book']
+        identifier = f"urn:uuid:{uuid.uuid5(uuid.NAMESPACE_URL, book['isbn'] + '/' + self.language)}"
+        modified = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+        manifest = [
+            '<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>',
+            '<item id="css" href="style.css" media-type="text/css"/>',
+        ]
+        spine = []
+        for page_num in self.pages:
+            manifest.append(f'<item id="p{page_num:04d}" href="{page_xhtml_name(page_num)}" '
+                            f'media-type="application/xhtml+xml"/>')
+            if self.image_dir:
+                manifest.append(f'<item id="img{page_num:04d}" href="{image_name(page_num)}" '
+                                f'media-type="image/png"/>')
+            spine.append(f'<itemref idref="p{page_num:04d}"/>')
+        manifest_items = '\n    '.join(manifest)
+        spine_items = '\n    '.join(spine)
+
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="bookid" xml:lang="{self.language}">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <dc:identifier id="bookid">{identifier}</dc:identifier>
+    <dc:title>{escape(book['title'], quote=False)}</dc:title>
+    <dc:creator>{escape(book['author'], quote=False)}</dc:creator>
+    <dc:publisher>{escape(book['publisher'], quote=False)}</dc:publisher>
+    <dc:language>{self.language}</dc:language>
+    <dc:description>{escape(book['description'], quote=False)}</dc:description>
+    <meta property="dcterms:modified">{modified}</meta>
+  </metadata>
+  <manifest>
+    {manifest_items}
+  </manifest>
+  <spine>
+    {spine_items}
+  </spine>
+</package>
+"""
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+
+def parse_page_range(value: str, total: int) -> List[int]:
+    """'1-50' or '9' into a list of page numbers"""
+    start, _, end = value.partition('-')
+    first, last = int(start), int(end or start)
+    if not 1 <= first <= last <= total:
+        raise argparse.ArgumentTypeError(f'page range must be within 1-{total}')
+    return list(range(first, last + 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the study guide as an EPUB 3 book')
+    parser.add_argument('--language', choices=sorted(LABELS), default='en', help='Text variant (default: en)')
+    parser.add_argument('--images', choices=('none', *IMAGE_TIERS), default='none',
+                        help='Image tier: none (text only, small), original page scans (~115 MB) or '
+                             'optimized scans from optimize_images.py')
+    parser.add_argument('--image-dir',
+                        help='Directory of page_XXXX.png scans (implies images, overrides the tier)')
+    parser.add_argument('--pages', help='Page range to export, e.g. 1-50 (default: all)')
+    parser.add_argument('--output', help='Output file (default: guns_germs_steel_<lang>.epub)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Compression threads')
+    parser.add_argument('--window', type=int, default=0,
+                        help='Entries in flight at once, bounding memory (default: 2 x workers)')
+    parser.add_argument('--level', type=int, default=9, choices=range(1, 10), metavar='1-9',
+                        help='Deflate level (default: 9)')
+    args = parser.parse_args()
+
+    with open('metadata.json', 'r', encoding='utf-8') as f:
+        total = json.load(f)['book']['total_pages']
+    pages = parse_page_range(args.pages, total) if args.pages else None
+    output = Path(args.output or f'guns_germs_steel_{args.language}.epub')
+    workers = max(1, args.workers)
+    window = args.window or 2 * workers
+
+    # An explicit directory implies images even without --images
+    image_dir = args.image_dir or IMAGE_TIERS.get(args.images)
+    if image_dir and not Path(image_dir).is_dir():
+        parser.error(f'{image_dir} not found (run optimize_images.py first for the optimized tier)')
+    builder = EpubBuilder(args.language, image_dir=image_dir,
+                          pages=pages)
+
+    print(f"📚 Exporting {len(builder.pages)} pages ({args.language.upper()}, images: {image_dir or 'none'})")
+    print(f"   {workers} compression threads, {window} entries in flight")
+    untranslated = builder.untranslated()
+    if untranslated:
+        print(f"⚠️  {len(untranslated)} pages have no {args.language.upper()} text and use English "
+              f"(first: {', '.join(map(str, untranslated[:10]))})")
+    start = time.perf_counter()
+    tmp_path = output.with_name(output.name + '.tmp')
+    try:
+        count, size = write_archive(tmp_path, builder.entries(), workers, window, args.level)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, output)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {output}: {count} entries, {size / 1024 / 1024:.1f} MB in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+/**
+ * Page Deltas
+ * Rebuilds a translated page from page_XXXX_<lang>.delta.json and its English source
+ * (format written by page_delta.py)
+ */
+
+const PageDelta = {
+    FORMAT: 1,
+    // Must match TAG_PATTERN in page_delta.py so node indices agree
+    TAG_PATTERN: /(<[A-Za-z!/?][^>]*>)/,
+
+    tokenize(html) {
+        // Alternating text and tag nodes, like re.split with a capture group
+        return html.split(this.TAG_PATTERN);
+    },
+
+    fnv1a32(text) {
+        // FNV-1a over UTF-16 code units, as in page_delta.fnv1a32
+        let h = 0x811c9dc5;
+        for (let i = 0; i < text.length; i++) {
+            h = Math.imul(h ^ text.charCodeAt(i), 0x01000193) >>> 0;
+        }
+        return h.toString(16).padStart(8, '0');
+    },
+
+    apply(sourceHtml, delta) {
+        if (delta.format !== this.FORMAT) {
+            throw new Error(`Unsupported delta format ${delta.format}`);
+        }
+        if (this.fnv1a32(sourceHtml) !== delta.source_hash) {
+            throw new Error(`${delta.source} changed since the delta was made`);
+        }
+        const nodes = this.tokenize(sourceHtml);
+
+        // Ops are sorted and disjoint: one pass copying untouched nodes
+        const out = [];
+        let pos = 0;
+        for (const [start, end, replacement] of delta.ops) {
+            for (let i = pos; i < start; i++) out.push(nodes[i]);
+            out.push(replacement);
+            pos = end;
+        }
+        for (let i = pos; i < nodes.length; i++) out.push(nodes[i]);
+        return out.join('');
+    }
+};
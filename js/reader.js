@@ -10,11 +10,19 @@ class DocumentReader {
         this.currentView = this.getStoredView() || 'text'; // 'text' or 'image'
         this.currentZoom = this.getStoredZoom() || 100;
         this.bookTitle = 'Guns, Germs, and Steel';
+        this.relatedIndex = null;
+        this.readingMode = this.getStoredReadingMode(); // 'page' or 'scroll'
+        this.telemetry = new ReaderTelemetry();
 
         this.initElements();
+        this.scrollView = new ContinuousScrollView(this, this.readerContent);
         this.attachEventListeners();
-        this.loadPage(this.currentPage);
+        if (this.readingMode === 'scroll') {
+            this.scrollView.enter(this.currentPage);
+        }
+        this.loadPage(this.currentPage, 'initial');
         this.updateUI();
+        this.loadRelatedIndex();
     }
 
     initElements() {
@@ -43,6 +51,10 @@ class DocumentReader {
         this.menuThemeToggle = document.getElementById('menuThemeToggle');
         this.langToggle = document.getElementById('langToggle');
         this.menuLangToggle = document.getElementById('menuLangToggle');
+        this.relatedSection = document.getElementById('relatedSection');
+        this.relatedPages = document.getElementById('relatedPages');
+        this.modeToggleBtn = document.getElementById('modeToggleBtn');
+        this.menuModeToggle = document.getElementById('menuModeToggle');
     }
 
     attachEventListeners() {
@@ -57,6 +69,11 @@ class DocumentReader {
         // View Toggle
         this.toggleViewBtn.addEventListener('click', () => this.toggleView());
 
+        // Reading mode toggle (single page / continuous scroll)
+        [this.modeToggleBtn, this.menuModeToggle].forEach(btn => {
+            if (btn) btn.addEventListener('click', () => this.toggleReadingMode());
+        });
+
         // Sidebar Toggle
         this.sidebarToggle.addEventListener('click', () => this.toggleSidebar());
 
@@ -86,6 +103,9 @@ class DocumentReader {
                 case 'n':
                     this.toggleSidebar();
                     break;
+                case 'c':
+                    this.toggleReadingMode();
+                    break;
                 case 't':
                     this.toggleTheme();
                     break;
@@ -151,6 +171,17 @@ class DocumentReader {
             });
         });
 
+        // Related pages (items are rebuilt per page, so delegate)
+        if (this.relatedPages) {
+            this.relatedPages.addEventListener('click', (e) => {
+                const item = e.target.closest('.bottom-menu-item');
+                if (item && item.dataset.page) {
+                    this.loadPage(parseInt(item.dataset.page));
+                    this.closeBottomMenu();
+                }
+            });
+        }
+
         // Bottom menu toggle
         this.bottomMenuToggle.addEventListener('click', () => this.toggleBottomMenu());
 
@@ -226,7 +257,7 @@ class DocumentReader {
                 localStorage.setItem('language', newLang);
                 this.updateLanguageToggle(newLang);
                 this.updateMenuLanguageToggle(newLang);
-                this.loadPage(this.currentPage); // Reload page with new language
+                this.reloadContent('language'); // Reload page with new language
             });
         }
 
@@ -243,12 +274,12 @@ class DocumentReader {
                 localStorage.setItem('language', newLang);
                 this.updateLanguageToggle(newLang);
                 this.updateMenuLanguageToggle(newLang);
-                this.loadPage(this.currentPage); // Reload page with new language
+                this.reloadContent('language'); // Reload page with new language
             });
         }
     }
 
-    async loadPage(pageNum) {
+    async loadPage(pageNum, trigger = 'navigate') {
         // Clamp to valid range
         if (pageNum < 1) pageNum = 1;
         if (pageNum > this.totalPages) pageNum = this.totalPages;
@@ -256,44 +287,40 @@ class DocumentReader {
         this.currentPage = pageNum;
         this.updateUI();
         this.storeState();
+        this.updateRelatedPages();
 
-        // Load the page content with language support
-        const language = localStorage.getItem('language') || 'en';
-        const langSuffix = language === 'ro' ? '_ro' : '';
-        const pageFile = `text/page_${String(pageNum).padStart(4, '0')}${langSuffix}.html`;
+        if (this.readingMode === 'scroll') {
+            this.scrollView.scrollToPage(pageNum);
+            return;
+        }
 
+        const start = performance.now();
+        const timings = {};
         try {
-            const response = await fetch(pageFile);
-            if (response.ok) {
-                const html = await response.text();
-                // Extract just the main content from the loaded page
-                const parser = new DOMParser();
-                const doc = parser.parseFromString(html, 'text/html');
-                const content = doc.querySelector('.page-container') || doc.body;
-
-                if (this.currentView === 'image') {
-                    this.readerContent.innerHTML = this.getImageView(pageNum);
-                } else {
-                    this.readerContent.innerHTML = content.innerHTML;
-                }
+            const content = await this.fetchPageContent(pageNum, timings);
+            // A newer navigation finished first; don't overwrite it
+            if (pageNum !== this.currentPage || this.readingMode === 'scroll') return;
+
+            const renderStart = performance.now();
+            if (content === null) {
+                this.readerContent.innerHTML = `<p>Error loading page ${pageNum}</p>`;
+                return;
+            } else if (this.currentView === 'image') {
+                this.readerContent.innerHTML = this.getImageView(pageNum);
             } else {
-                // If Romanian version doesn't exist, fall back to English
-                if (language === 'ro') {
-                    const fallbackFile = `text/page_${String(pageNum).padStart(4, '0')}.html`;
-                    const fallbackResponse = await fetch(fallbackFile);
-                    if (fallbackResponse.ok) {
-                        const html = await fallbackResponse.text();
-                        const parser = new DOMParser();
-                        const doc = parser.parseFromString(html, 'text/html');
-                        const content = doc.querySelector('.page-container') || doc.body;
-                        this.readerContent.innerHTML = content.innerHTML;
-                    } else {
-                        this.readerContent.innerHTML = `<p>Error loading page ${pageNum}</p>`;
-                    }
-                } else {
-                    this.readerContent.innerHTML = `<p>Error loading page ${pageNum}</p>`;
-                }
+                this.readerContent.innerHTML = content;
+            }
+            await this.nextFrame();
+            timings.render = performance.now() - renderStart;
+
+            const img = this.readerContent.querySelector('img');
+            if (img && img.decode) {
+                const decodeStart = performance.now();
+                await img.decode().catch(() => {});
+                timings.decode = performance.now() - decodeStart;
             }
+            timings.total = performance.now() - start;
+            this.recordLoadTimings(pageNum, trigger, timings);
         } catch (error) {
             this.readerContent.innerHTML = `
                 <div style="padding: 20px; text-align: center;">
@@ -304,6 +331,138 @@ class DocumentReader {
         }
     }
 
+    async fetchPageContent(pageNum, timings = null) {
+        // Load the page content with language support
+        const fetchStart = performance.now();
+        const language = localStorage.getItem('language') || 'en';
+        const langSuffix = language === 'ro' ? '_ro' : '';
+        const pageFile = `text/page_${String(pageNum).padStart(4, '0')}${langSuffix}.html`;
+
+        let response = await fetch(pageFile);
+        let html = null;
+        if (!response.ok && language === 'ro') {
+            // No full Romanian page: rebuild it from its delta against the
+            // English source, which is also the fallback, so fetch both at once
+            const base = `text/page_${String(pageNum).padStart(4, '0')}`;
+            const [deltaResponse, sourceResponse] = await Promise.all([
+                fetch(`${base}_ro.delta.json`), fetch(`${base}.html`)
+            ]);
+            response = sourceResponse;
+            if (response.ok) {
+                html = await response.text();
+                if (deltaResponse.ok) {
+                    try {
+                        html = PageDelta.apply(html, await deltaResponse.json());
+                    } catch (error) {
+                        console.warn(`Page ${pageNum}: ${error.message}`);
+                    }
+                }
+            }
+        }
+        if (!response.ok) return null;
+
+        if (html === null) html = await response.text();
+        const parseStart = performance.now();
+        // Extract just the main content from the loaded page
+        const parser = new DOMParser();
+        const doc = parser.parseFromString(html, 'text/html');
+        const content = doc.querySelector('.page-container') || doc.body;
+        if (timings) {
+            timings.fetch = parseStart - fetchStart;
+            timings.parse = performance.now() - parseStart;
+        }
+        return content.innerHTML;
+    }
+
+    nextFrame() {
+        // Resolves once the browser has had a chance to lay out and paint
+        return new Promise(resolve => requestAnimationFrame(() => setTimeout(resolve, 0)));
+    }
+
+    recordLoadTimings(pageNum, trigger, timings) {
+        const fields = {
+            page: pageNum,
+            trigger,
+            view: this.currentView,
+            lang: localStorage.getItem('language') || 'en'
+        };
+        Object.entries(timings).forEach(([metric, ms]) => this.telemetry.record(metric, ms, fields));
+    }
+
+    reloadContent(trigger) {
+        // Language or view changed: re-render whatever the current mode shows
+        if (this.readingMode === 'scroll') {
+            this.scrollView.refresh();
+        } else {
+            this.loadPage(this.currentPage, trigger);
+        }
+    }
+
+    toggleReadingMode() {
+        this.readingMode = this.readingMode === 'page' ? 'scroll' : 'page';
+        this.storeReadingMode();
+        this.updateModeButtons();
+
+        if (this.readingMode === 'scroll') {
+            this.readerContent.style.transform = '';
+            this.scrollView.enter(this.currentPage);
+        } else {
+            this.scrollView.exit();
+            this.loadPage(this.currentPage, 'mode');
+            this.setZoom(this.currentZoom);
+        }
+    }
+
+    syncPageFromScroll(pageNum) {
+        // Scrolling changed the page in view; update UI without navigating
+        if (pageNum === this.currentPage) return;
+        this.currentPage = pageNum;
+        this.updateUI();
+        this.storeState();
+        this.updateRelatedPages();
+    }
+
+    updateModeButtons() {
+        const isScroll = this.readingMode === 'scroll';
+        if (this.modeToggleBtn) {
+            this.modeToggleBtn.textContent = isScroll ? '📄 Page' : '📜 Scroll';
+        }
+        if (this.menuModeToggle) {
+            this.menuModeToggle.textContent = isScroll ? '📜 Continuous' : '📄 Single Page';
+        }
+    }
+
+    async loadRelatedIndex() {
+        // Built by build_related_index.py; the reader works without it
+        try {
+            const response = await fetch('related_pages.json');
+            if (response.ok) {
+                this.relatedIndex = await response.json();
+                this.updateRelatedPages();
+            }
+        } catch (error) {
+            this.relatedIndex = null;
+        }
+    }
+
+    updateRelatedPages() {
+        if (!this.relatedIndex || !this.relatedPages) return;
+
+        const neighbors = this.relatedIndex.neighbors[this.currentPage] || [];
+        this.relatedPages.innerHTML = '';
+        neighbors.forEach(([page]) => {
+            const item = document.createElement('span');
+            item.className = 'bottom-menu-item';
+            item.dataset.page = page;
+            item.textContent = `p. ${page}`;
+            // Labels are summary snippets, too long for the menu row
+            const label = this.relatedIndex.labels[page];
+            if (label) item.title = label;
+            this.relatedPages.appendChild(item);
+        });
+        this.relatedSection.style.display = neighbors.length ? '' : 'none';
+    }
+
     getImageView(pageNum) {
         const imagePath = `pages/page_${String(pageNum).padStart(4, '0')}.png`;
         return `
@@ -317,7 +476,7 @@ class DocumentReader {
         this.currentView = this.currentView === 'text' ? 'image' : 'text';
         this.storeView();
         this.updateViewButton();
-        this.loadPage(this.currentPage);
+        this.reloadContent('view');
         // Apply zoom level to new view
         setTimeout(() => this.setZoom(this.currentZoom), 100);
     }
@@ -448,7 +607,7 @@ class DocumentReader {
         
         localStorage.setItem('language', newLang);
         this.updateLanguageToggle(newLang);
-        this.loadPage(this.currentPage); // Reload page with new language
+        this.reloadContent('language'); // Reload page with new language
     }
 
     toggleMenu() {
@@ -522,8 +681,10 @@ class DocumentReader {
 
         // Apply zoom to both image and text views
         const zoomScale = zoomLevel / 100;
-        if (this.currentView === 'image') {
-            this.loadPage(this.currentPage);
+        if (this.readingMode === 'scroll') {
+            this.scrollView.setScale(zoomScale);
+        } else if (this.currentView === 'image') {
+            this.loadPage(this.currentPage, 'zoom');
         } else {
             // Apply scaling to text view content
             this.readerContent.style.transform = `scale(${zoomScale})`;
@@ -548,8 +709,9 @@ class DocumentReader {
         this.prevBtn.disabled = this.currentPage <= 1;
         this.nextBtn.disabled = this.currentPage >= this.totalPages;
 
-        // Update view button
+        // Update view and reading mode buttons
         this.updateViewButton();
+        this.updateModeButtons();
 
         // Update sidebar visibility
         this.updateSidebarVisibility();
@@ -597,12 +759,315 @@ class DocumentReader {
         localStorage.setItem('ggs_bottomMenuVisible', this.bottomMenuVisible);
     }
 
+    storeReadingMode() {
+        localStorage.setItem('ggs_readingMode', this.readingMode);
+    }
+
+    getStoredReadingMode() {
+        return localStorage.getItem('ggs_readingMode') === 'scroll' ? 'scroll' : 'page';
+    }
+
     getStoredBottomMenuState() {
         const stored = localStorage.getItem('ggs_bottomMenuVisible');
         return stored ? stored === 'true' : false;
     }
 }
 
+/**
+ * Continuous-scroll reading mode: a virtualized list of all pages.
+ * Only pages near the viewport own a DOM node; nodes are recycled from a
+ * pool, and every other page is represented by its measured (or estimated)
+ * height so the scrollbar stays stable. Content loads are driven by an
+ * IntersectionObserver on the mounted nodes.
+ */
+class ContinuousScrollView {
+    constructor(reader, viewport) {
+        this.reader = reader;
+        this.viewport = viewport;
+        this.totalPages = reader.totalPages;
+        this.buffer = 2;            // pages mounted above and below the viewport
+        this.gap = 30;
+        this.scale = 1;
+        this.active = false;
+
+        // Measured heights per view (0 = not measured yet), unscaled
+        this.heights = {
+            text: new Float64Array(this.totalPages + 1),
+            image: new Float64Array(this.totalPages + 1)
+        };
+        this.offsets = new Float64Array(this.totalPages + 2);
+
+        this.mounted = new Map();   // page -> slot element
+        this.pool = [];             // detached slots ready for reuse
+        this.contentCache = new Map();
+        this.cacheLimit = 16;
+        this.frameRequested = false;
+        // scrollTop we set ourselves (as clamped by the browser); scroll
+        // events landing there are ours and must not re-sync the page
+        this.programmaticTop = null;
+
+        this.onScroll = () => {
+            if (this.frameRequested) return;
+            this.frameRequested = true;
+            requestAnimationFrame(() => {
+                this.frameRequested = false;
+                this.update();
+            });
+        };
+    }
+
+    enter(pageNum) {
+        this.active = true;
+        this.scale = this.reader.currentZoom / 100;
+        this.viewport.innerHTML = '';
+        this.viewport.classList.add('continuous');
+
+        this.track = document.createElement('div');
+        this.track.className = 'scroll-track';
+        this.viewport.appendChild(this.track);
+
+        if ('IntersectionObserver' in window) {
+            // Preload one viewport ahead in both directions
+            this.observer = new IntersectionObserver(
+                (entries) => this.onIntersect(entries),
+                { root: this.viewport, rootMargin: '100% 0px' }
+            );
+        }
+        this.viewport.addEventListener('scroll', this.onScroll, { passive: true });
+
+        this.computeOffsets();
+        this.scrollToPage(pageNum);
+    }
+
+    exit() {
+        if (!this.active) return;
+        this.active = false;
+        this.viewport.removeEventListener('scroll', this.onScroll);
+        if (this.observer) this.observer.disconnect();
+        this.observer = null;
+        this.mounted.clear();
+        this.pool = [];
+        this.viewport.classList.remove('continuous');
+        this.viewport.innerHTML = '';
+    }
+
+    refresh() {
+        // Language or view changed: drop cached content and remount
+        if (!this.active) return;
+        const page = this.reader.currentPage;
+        this.contentCache.clear();
+        this.mounted.forEach((slot) => this.recycle(slot));
+        this.mounted.clear();
+        this.computeOffsets();
+        this.scrollToPage(page);
+    }
+
+    setScale(scale) {
+        if (!this.active || scale === this.scale) return;
+        const page = this.reader.currentPage;
+        this.scale = scale;
+        this.mounted.forEach((slot) => {
+            slot.firstChild.style.transform = `scale(${scale})`;
+        });
+        this.computeOffsets();
+        this.scrollToPage(page);
+    }
+
+    scrollToPage(pageNum) {
+        if (!this.active) return;
+        const top = this.viewport.scrollTop;
+        const inView = this.offsets[pageNum] >= top
+            && this.offsets[pageNum + 1] - this.gap <= top + this.viewport.clientHeight;
+        // A page already fully visible stays put, so short pages at the end don't bounce
+        if (!inView) this.setScrollTop(this.offsets[pageNum]);
+        else this.programmaticTop = top;
+        this.update();
+    }
+
+    setScrollTop(value) {
+        this.viewport.scrollTop = value;
+        // Read back: the browser clamps near the end of the track
+        this.programmaticTop = this.viewport.scrollTop;
+    }
+
+    estimatedHeight() {
+        if (this.reader.currentView === 'image') {
+            // Scans are roughly 3:4 portrait
+            return Math.max(400, this.track.clientWidth * 1.35);
+        }
+        return 900;
+    }
+
+    slotHeight(page) {
+        const measured = this.heights[this.reader.currentView][page];
+        return (measured || this.estimatedHeight()) * this.scale;
+    }
+
+    computeOffsets() {
+        this.offsets[1] = 0;
+        for (let page = 1; page <= this.totalPages; page++) {
+            this.offsets[page + 1] = this.offsets[page] + this.slotHeight(page) + this.gap;
+        }
+        this.track.style.height = `${this.offsets[this.totalPages + 1]}px`;
+        this.mounted.forEach((slot, page) => this.position(slot, page));
+    }
+
+    pageAt(y) {
+        // Binary search: last page whose offset is <= y
+        let lo = 1;
+        let hi = this.totalPages;
+        while (lo < hi) {
+            const mid = (lo + hi + 1) >> 1;
+            if (this.offsets[mid] <= y) lo = mid;
+            else hi = mid - 1;
+        }
+        return lo;
+    }
+
+    update() {
+        if (!this.active) return;
+        const top = this.viewport.scrollTop;
+        const bottom = top + this.viewport.clientHeight;
+        const first = Math.max(1, this.pageAt(top) - this.buffer);
+        const last = Math.min(this.totalPages, this.pageAt(bottom) + this.buffer);
+
+        // Recycle nodes that left the window, then mount the missing pages
+        this.mounted.forEach((slot, page) => {
+            if (page < first || page > last) {
+                this.recycle(slot);
+                this.mounted.delete(page);
+            }
+        });
+        for (let page = first; page <= last; page++) {
+            if (!this.mounted.has(page)) this.mount(page);
+        }
+
+        if (this.programmaticTop !== null && Math.abs(top - this.programmaticTop) < 1) return;
+        // The reader scrolled away from where we put them: follow the viewport
+        this.programmaticTop = null;
+        this.reader.syncPageFromScroll(this.pageAt(top + this.viewport.clientHeight / 3));
+    }
+
+    mount(page) {
+        let slot = this.pool.pop();
+        if (!slot) {
+            slot = document.createElement('div');
+            slot.className = 'scroll-page';
+            slot.appendChild(document.createElement('div')).className = 'scroll-page-inner';
+        }
+        slot.dataset.page = page;
+        slot.dataset.loaded = '';
+        slot.firstChild.style.transform = `scale(${this.scale})`;
+        slot.firstChild.innerHTML = `<div class="scroll-page-placeholder">Page ${page}</div>`;
+        slot.style.display = '';
+        this.position(slot, page);
+        this.track.appendChild(slot);
+        this.mounted.set(page, slot);
+
+        if (this.observer) {
+            this.observer.observe(slot);
+        } else {
+            this.loadSlot(slot, page);
+        }
+    }
+
+    recycle(slot) {
+        if (this.observer) this.observer.unobserve(slot);
+        slot.dataset.page = '';
+        slot.firstChild.innerHTML = '';
+        slot.style.display = 'none';
+        this.pool.push(slot);
+    }
+
+    position(slot, page) {
+        slot.style.top = `${this.offsets[page]}px`;
+        slot.style.height = `${this.slotHeight(page)}px`;
+    }
+
+    onIntersect(entries) {
+        entries.forEach((entry) => {
+            const slot = entry.target;
+            const page = parseInt(slot.dataset.page);
+            if (entry.isIntersecting && page && !slot.dataset.loaded) {
+                this.loadSlot(slot, page);
+            }
+        });
+    }
+
+    async loadSlot(slot, page) {
+        slot.dataset.loaded = 'loading';
+        let html;
+        if (this.reader.currentView === 'image') {
+            const imagePath = `pages/page_${String(page).padStart(4, '0')}.png`;
+            html = `<div class="image-view"><img src="${imagePath}" alt="Page ${page}" class="page-image" title="Page ${page}" decoding="async"></div>`;
+        } else {
+            try {
+                html = await this.fetchContent(page);
+            } catch (error) {
+                html = null;
+            }
+            if (html === null) html = `<p>Could not load page ${page}</p>`;
+        }
+
+        // The slot may have been recycled for another page meanwhile
+        if (!this.active || parseInt(slot.dataset.page) !== page) return;
+        slot.dataset.loaded = 'done';
+        slot.firstChild.innerHTML = html;
+
+        const img = slot.querySelector('img');
+        if (img && !img.complete) {
+            img.addEventListener('load', () => this.measure(slot, page), { once: true });
+        } else {
+            requestAnimationFrame(() => this.measure(slot, page));
+        }
+    }
+
+    async fetchContent(page) {
+        const language = localStorage.getItem('language') || 'en';
+        const key = `${language}:${page}`;
+        if (this.contentCache.has(key)) {
+            // Refresh LRU position
+            const cached = this.contentCache.get(key);
+            this.contentCache.delete(key);
+            this.contentCache.set(key, cached);
+            return cached;
+        }
+
+        const timings = {};
+        const html = await this.reader.fetchPageContent(page, timings);
+        if (html !== null) {
+            this.reader.recordLoadTimings(page, 'scroll', timings);
+            this.contentCache.set(key, html);
+            if (this.contentCache.size > this.cacheLimit) {
+                this.contentCache.delete(this.contentCache.keys().next().value);
+            }
+        }
+        return html;
+    }
+
+    measure(slot, page) {
+        if (!this.active || parseInt(slot.dataset.page) !== page) return;
+        const heights = this.heights[this.reader.currentView];
+        const height = slot.firstChild.offsetHeight;
+        if (!height || Math.abs(height - heights[page]) < 1) return;
+
+        // Keep the content under the reader's eyes still when a page above changes size
+        const before = this.slotHeight(page);
+        heights[page] = height;
+        const delta = this.slotHeight(page) - before;
+        const above = this.offsets[page] + before <= this.viewport.scrollTop;
+
+        this.computeOffsets();
+        if (above && delta) {
+            const anchored = this.programmaticTop !== null
+                && Math.abs(this.viewport.scrollTop - this.programmaticTop) < 1;
+            this.viewport.scrollTop += delta;
+            // Only our own position stays exempt from syncing; a user scroll still syncs
+            if (anchored) this.programmaticTop = this.viewport.scrollTop;
+        }
+    }
+}
+
 // Initialize reader when DOM is ready
 document.addEventListener('DOMContentLoaded', () => {
     new DocumentReader();
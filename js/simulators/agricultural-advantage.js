@@ -10,6 +10,13 @@ class AgriculturalSimulator {
         this.isRunning = false;
         this.year = 0;
         this.maxYears = 5000;
+        this.loop = new SimulationLoop({
+            step: () => this.step(),
+            render: () => this.render(),
+            onComplete: () => this.onComplete()
+        });
+        this.renderer = new DirtyRegionRenderer(this.canvas);
+        this.renderer.setStaticLayer((ctx, w, h) => this.drawBackgroundLayer(ctx, w, h));
 
         this.initControls();
         this.drawInitialState();
@@ -34,6 +41,7 @@ class AgriculturalSimulator {
 
         // Buttons
         document.getElementById('startBtn').addEventListener('click', () => this.startSimulation());
+        document.getElementById('fastForwardBtn').addEventListener('click', () => this.fastForward());
         document.getElementById('resetBtn').addEventListener('click', () => this.reset());
 
         // Presets
@@ -77,16 +85,31 @@ class AgriculturalSimulator {
             this.population = 1000;
             this.technology = 0;
             this.specialization = 0;
+            this.milestone1 = false;
+            this.milestone2 = false;
+            this.milestone3 = false;
+            // Canvas holds the intro text, so the first frame repaints everything
+            this.renderer.clearSprites();
             document.getElementById('startBtn').disabled = true;
 
             this.addTrace('🌱 Simulation started', 'success');
             this.addTrace(`Conditions: Crop=${this.cropValue}%, Animal=${this.animalValue}%, Geography=${this.geoValue}%`, 'info');
 
-            this.animate();
+            this.loop.start();
+        }
+    }
+
+    fastForward() {
+        const steps = parseInt(document.getElementById('fastForwardSteps').value) || 20;
+        this.startSimulation();
+        if (this.isRunning) {
+            const ran = this.loop.fastForward(steps);
+            this.addTrace(`⏩ Fast-forwarded ${ran * 50} years`, 'info');
         }
     }
 
     reset() {
+        this.loop.stop();
         this.isRunning = false;
         this.year = 0;
         this.population = 0;
@@ -98,16 +121,7 @@ class AgriculturalSimulator {
         document.getElementById('traceLog').innerHTML = '<p class="trace-item trace-info">Simulation reset. Ready to start again.</p>';
     }
 
-    animate() {
-        if (!this.isRunning || this.year > this.maxYears) {
-            this.isRunning = false;
-            document.getElementById('startBtn').disabled = false;
-            if (this.year > this.maxYears) {
-                this.addTrace('✅ Simulation complete', 'success');
-            }
-            return;
-        }
-
+    step() {
         // Advance year
         this.year += 50;
 
@@ -127,9 +141,6 @@ class AgriculturalSimulator {
         const specRate = (Math.log(this.population) / 10) * (this.technology / 100) * (geoBonus / 100);
         this.specialization = Math.min(100, this.specialization + specRate);
 
-        this.updateStats();
-        this.drawSimulation();
-
         // Log milestones
         if (this.population > 10000 && !this.milestone1) {
             this.milestone1 = true;
@@ -146,7 +157,20 @@ class AgriculturalSimulator {
             this.addTrace(`🏗️  Year ${this.year}: Complex society forming`, 'success');
         }
 
-        requestAnimationFrame(() => this.animate());
+        return this.year <= this.maxYears;
+    }
+
+    render() {
+        this.updateStats();
+        this.drawSimulation();
+    }
+
+    onComplete() {
+        this.isRunning = false;
+        document.getElementById('startBtn').disabled = false;
+        if (this.year > this.maxYears) {
+            this.addTrace('✅ Simulation complete', 'success');
+        }
     }
 
     updateStats() {
@@ -179,64 +203,88 @@ class AgriculturalSimulator {
         this.ctx.fillText('Watch civilization develop over time', w / 2, h / 2 + 20);
     }
 
+    drawBackgroundLayer(ctx, w, h) {
+        // Background
+        ctx.fillStyle = '#f9f7f4';
+        ctx.fillRect(0, 0, w, h);
+
+        // Grid
+        ctx.strokeStyle = '#eee';
+        ctx.lineWidth = 1;
+        for (let i = 0; i <= 5; i++) {
+            ctx.beginPath();
+            ctx.moveTo((w / 5) * i, 0);
+            ctx.lineTo((w / 5) * i, h);
+            ctx.stroke();
+
+            ctx.beginPath();
+            ctx.moveTo(0, (h / 5) * i);
+            ctx.lineTo(w, (h / 5) * i);
+            ctx.stroke();
+        }
+    }
+
     drawSimulation() {
         const w = this.canvas.width;
         const h = this.canvas.height;
         const centerX = w / 2;
         const centerY = h / 2;
+        const r = this.renderer;
 
-        // Background
-        this.ctx.fillStyle = '#f9f7f4';
-        this.ctx.fillRect(0, 0, w, h);
-
-        // Grid
-        this.ctx.strokeStyle = '#eee';
-        this.ctx.lineWidth = 1;
-        for (let i = 0; i <= 5; i++) {
-            this.ctx.beginPath();
-            this.ctx.moveTo((w / 5) * i, 0);
-            this.ctx.lineTo((w / 5) * i, h);
-            this.ctx.stroke();
-
-            this.ctx.beginPath();
-            this.ctx.moveTo(0, (h / 5) * i);
-            this.ctx.lineTo(w, (h / 5) * i);
-            this.ctx.stroke();
-        }
+        // Each sprite is keyed by what it displays, so unchanged ones cost nothing
 
         // Population representation (circles)
-        const popScale = Math.log(this.population) / 10;
-        this.ctx.fillStyle = 'rgba(65, 105, 225, 0.3)';
-        this.ctx.beginPath();
-        this.ctx.arc(centerX - 80, centerY - 80, Math.min(80, popScale), 0, Math.PI * 2);
-        this.ctx.fill();
+        const popRadius = Math.min(80, Math.log(this.population) / 10);
+        const popX = centerX - 80;
+        const popY = centerY - 80;
+        r.setSprite('population', { x: popX - 80, y: popY - 80, w: 160, h: 160 }, popRadius.toFixed(2), (ctx) => {
+            ctx.fillStyle = 'rgba(65, 105, 225, 0.3)';
+            ctx.beginPath();
+            ctx.arc(popX, popY, popRadius, 0, Math.PI * 2);
+            ctx.fill();
+        });
 
         // Technology representation (bars)
         const techWidth = (this.technology / 100) * 150;
-        this.ctx.fillStyle = 'rgba(34, 139, 34, 0.3)';
-        this.ctx.fillRect(centerX + 30, centerY - 80, techWidth, 40);
+        r.setSprite('technology', { x: centerX + 30, y: centerY - 80, w: 150, h: 40 }, techWidth.toFixed(1), (ctx) => {
+            ctx.fillStyle = 'rgba(34, 139, 34, 0.3)';
+            ctx.fillRect(centerX + 30, centerY - 80, techWidth, 40);
+        });
 
         // Specialization representation (star growth)
-        this.drawSpecializationStar(centerX, centerY + 60, this.specialization);
+        const level = this.specialization;
+        r.setSprite('specialization', { x: centerX - 40, y: centerY + 20, w: 80, h: 80 }, level.toFixed(1), (ctx) => {
+            this.drawSpecializationStar(ctx, centerX, centerY + 60, level);
+        });
 
         // Labels
-        this.ctx.fillStyle = '#2c3e50';
-        this.ctx.font = 'bold 14px system-ui';
-        this.ctx.textAlign = 'center';
-        this.ctx.fillText(`Year ${this.year}`, centerX, 30);
+        this.setLabelSprite('year', `Year ${this.year}`, centerX, 30, 'bold 14px system-ui', 140);
+        this.setLabelSprite('populationLabel', `Population: ${Math.round(this.population).toLocaleString()}`,
+            centerX - 80, centerY - 150, '12px Georgia', 170);
+        this.setLabelSprite('techLabel', `Tech: ${Math.round(this.technology)}%`,
+            centerX + 80, centerY - 150, '12px Georgia', 110);
+        this.setLabelSprite('specLabel', `Specialization: ${Math.round(this.specialization)}%`,
+            centerX, centerY + 140, '12px Georgia', 170);
+
+        r.render();
+    }
 
-        this.ctx.font = '12px Georgia';
-        this.ctx.fillText(`Population: ${Math.round(this.population).toLocaleString()}`, centerX - 80, centerY - 150);
-        this.ctx.fillText(`Tech: ${Math.round(this.technology)}%`, centerX + 80, centerY - 150);
-        this.ctx.fillText(`Specialization: ${Math.round(this.specialization)}%`, centerX, centerY + 140);
+    setLabelSprite(id, text, x, y, font, maxWidth) {
+        const bounds = { x: x - maxWidth / 2, y: y - 16, w: maxWidth, h: 22 };
+        this.renderer.setSprite(id, bounds, text, (ctx) => {
+            ctx.fillStyle = '#2c3e50';
+            ctx.font = font;
+            ctx.textAlign = 'center';
+            ctx.fillText(text, x, y, maxWidth);
+        });
     }
 
-    drawSpecializationStar(cx, cy, level) {
+    drawSpecializationStar(ctx, cx, cy, level) {
         const points = 5;
         const radius = 30 * (level / 100 + 0.3);
 
-        this.ctx.fillStyle = `rgba(218, 165, 32, ${0.2 + (level / 100) * 0.3})`;
-        this.ctx.beginPath();
+        ctx.fillStyle = `rgba(218, 165, 32, ${0.2 + (level / 100) * 0.3})`;
+        ctx.beginPath();
 
         for (let i = 0; i < points * 2; i++) {
             const angle = (i * Math.PI) / points;
@@ -244,12 +292,12 @@ class AgriculturalSimulator {
             const x = cx + r * Math.sin(angle);
             const y = cy - r * Math.cos(angle);
 
-            if (i === 0) this.ctx.moveTo(x, y);
-            else this.ctx.lineTo(x, y);
+            if (i === 0) ctx.moveTo(x, y);
+            else ctx.lineTo(x, y);
         }
 
-        this.ctx.closePath();
-        this.ctx.fill();
+        ctx.closePath();
+        ctx.fill();
     }
 
     addTrace(message, type = 'info') {
@@ -0,0 +1,177 @@
+/**
+ * Dirty-Region Canvas Renderer
+ * Retained sprites over a cached static layer, repainting only what changed
+ */
+
+class DirtyRegionRenderer {
+    constructor(canvas, { bucketSize = 64, padding = 2 } = {}) {
+        this.canvas = canvas;
+        this.ctx = canvas.getContext('2d');
+        this.width = canvas.width;
+        this.height = canvas.height;
+        this.bucketSize = bucketSize;
+        this.padding = padding;
+
+        // Static layer (background, grid lines, outlines) painted once offscreen
+        this.staticLayer = document.createElement('canvas');
+        this.staticLayer.width = this.width;
+        this.staticLayer.height = this.height;
+        this.staticDraw = null;
+
+        this.sprites = new Map();   // id -> { bounds, key, draw, z }
+        this.buckets = new Map();   // "bx,by" -> Set of sprite ids
+        this.dirty = [];
+        this.fullRepaint = false;
+        this.nextZ = 0;
+    }
+
+    /**
+     * Paint the static layer with drawFn(ctx, width, height) and repaint everything
+     */
+    setStaticLayer(drawFn) {
+        this.staticDraw = drawFn;
+        const ctx = this.staticLayer.getContext('2d');
+        ctx.clearRect(0, 0, this.width, this.height);
+        drawFn(ctx, this.width, this.height);
+        this.markAllDirty();
+    }
+
+    /**
+     * Add or update a sprite. Nothing is repainted when both the key and
+     * the bounds are unchanged, so callers can pass any value that fully
+     * determines the sprite's appearance (a status, a rounded level...).
+     */
+    setSprite(id, bounds, key, draw) {
+        const existing = this.sprites.get(id);
+        if (existing && existing.key === key && this.sameBounds(existing.bounds, bounds)) {
+            existing.draw = draw;
+            return;
+        }
+
+        if (existing) {
+            this.markDirty(existing.bounds);
+            this.unindex(id, existing.bounds);
+        }
+        const sprite = { bounds, key, draw, z: existing ? existing.z : this.nextZ++ };
+        this.sprites.set(id, sprite);
+        this.index(id, bounds);
+        this.markDirty(bounds);
+    }
+
+    removeSprite(id) {
+        const existing = this.sprites.get(id);
+        if (!existing) return;
+        this.markDirty(existing.bounds);
+        this.unindex(id, existing.bounds);
+        this.sprites.delete(id);
+    }
+
+    clearSprites() {
+        this.sprites.clear();
+        this.buckets.clear();
+        this.nextZ = 0;
+        this.markAllDirty();
+    }
+
+    markDirty(bounds) {
+        const p = this.padding;
+        const x = Math.max(0, Math.floor(bounds.x - p));
+        const y = Math.max(0, Math.floor(bounds.y - p));
+        const right = Math.min(this.width, Math.ceil(bounds.x + bounds.w + p));
+        const bottom = Math.min(this.height, Math.ceil(bounds.y + bounds.h + p));
+        if (right > x && bottom > y) {
+            this.dirty.push({ x, y, w: right - x, h: bottom - y });
+        }
+    }
+
+    markAllDirty() {
+        this.dirty = [{ x: 0, y: 0, w: this.width, h: this.height }];
+        this.fullRepaint = true;
+    }
+
+    /**
+     * Repaint dirty rectangles: static layer first, then the sprites that
+     * overlap each rectangle in insertion order. Returns the rect count.
+     */
+    render() {
+        if (this.dirty.length === 0) return 0;
+
+        let rects = this.dirty;
+        const area = rects.reduce((sum, r) => sum + r.w * r.h, 0);
+        // Many scattered rects cost more than one full pass
+        if (this.fullRepaint || area > this.width * this.height * 0.5 || rects.length > 256) {
+            rects = [{ x: 0, y: 0, w: this.width, h: this.height }];
+        }
+        this.dirty = [];
+        this.fullRepaint = false;
+
+        const ctx = this.ctx;
+        for (const rect of rects) {
+            ctx.save();
+            ctx.beginPath();
+            ctx.rect(rect.x, rect.y, rect.w, rect.h);
+            ctx.clip();
+            ctx.clearRect(rect.x, rect.y, rect.w, rect.h);
+            if (this.staticDraw) {
+                ctx.drawImage(this.staticLayer, rect.x, rect.y, rect.w, rect.h, rect.x, rect.y, rect.w, rect.h);
+            }
+            for (const sprite of this.spritesIn(rect)) {
+                ctx.save();
+                sprite.draw(ctx);
+                ctx.restore();
+            }
+            ctx.restore();
+        }
+        return rects.length;
+    }
+
+    spritesIn(rect) {
+        const ids = new Set();
+        this.forEachBucket(rect, (key) => {
+            const bucket = this.buckets.get(key);
+            if (bucket) bucket.forEach(id => ids.add(id));
+        });
+
+        const found = [];
+        ids.forEach(id => {
+            const sprite = this.sprites.get(id);
+            if (sprite && this.intersects(sprite.bounds, rect)) found.push(sprite);
+        });
+        return found.sort((a, b) => a.z - b.z);
+    }
+
+    index(id, bounds) {
+        this.forEachBucket(bounds, (key) => {
+            if (!this.buckets.has(key)) this.buckets.set(key, new Set());
+            this.buckets.get(key).add(id);
+        });
+    }
+
+    unindex(id, bounds) {
+        this.forEachBucket(bounds, (key) => {
+            const bucket = this.buckets.get(key);
+            if (bucket) bucket.delete(id);
+        });
+    }
+
+    forEachBucket(bounds, fn) {
+        const size = this.bucketSize;
+        const x0 = Math.floor(bounds.x / size);
+        const y0 = Math.floor(bounds.y / size);
+        const x1 = Math.floor((bounds.x + bounds.w) / size);
+        const y1 = Math.floor((bounds.y + bounds.h) / size);
+        for (let bx = x0; bx <= x1; bx++) {
+            for (let by = y0; by <= y1; by++) {
+                fn(`${bx},${by}`);
+            }
+        }
+    }
+
+    intersects(a, b) {
+        return a.x < b.x + b.w && b.x < a.x + a.w && a.y < b.y + b.h && b.y < a.y + a.h;
+    }
+
+    sameBounds(a, b) {
+        return a.x === b.x && a.y === b.y && a.w === b.w && a.h === b.h;
+    }
+}
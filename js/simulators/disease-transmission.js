@@ -3,22 +3,45 @@
  * Shows how domestication + population density enable epidemics
  */
 
+const STATUS_COLORS = {
+    healthy: '#87CEEB',
+    infected: '#DC143C',
+    immune: '#228B22',
+    dead: '#999'
+};
+
 class DiseaseSimulator {
     constructor() {
         this.canvas = document.getElementById('simulatorCanvas');
         this.ctx = this.canvas.getContext('2d');
         this.isRunning = false;
         this.timeStep = 0;
+        this.maxSteps = 500;
+
+        // Seeded so a run can be replayed exactly
+        this.seed = 42;
+        this.rng = new SeededRandom(this.seed);
+        this.loop = new SimulationLoop({
+            step: () => this.step(),
+            render: () => this.render(),
+            onComplete: () => this.onComplete()
+        });
 
         // Population grid
         this.gridSize = 10;
         this.individuals = [];
+        this.changedCells = new Set();
         this.initGrid();
+
+        this.renderer = new DirtyRegionRenderer(this.canvas);
+        this.renderer.setStaticLayer((ctx, w, h) => this.drawGridLayer(ctx, w, h));
         this.initControls();
         this.drawInitialState();
     }
 
     initGrid() {
+        this.individuals = [];
+        this.changedCells.clear();
         for (let i = 0; i < this.gridSize * this.gridSize; i++) {
             this.individuals.push({
                 status: 'healthy', // healthy, infected, immune, dead
@@ -43,7 +66,13 @@ class DiseaseSimulator {
             document.getElementById('virulenceValue').textContent = `${this.virulence}%`;
         });
 
+        document.getElementById('seedInput').addEventListener('change', (e) => {
+            const seed = parseInt(e.target.value);
+            if (!isNaN(seed)) this.seed = seed;
+        });
+
         document.getElementById('startBtn').addEventListener('click', () => this.startSimulation());
+        document.getElementById('fastForwardBtn').addEventListener('click', () => this.fastForward());
         document.getElementById('resetBtn').addEventListener('click', () => this.reset());
 
         this.density = 50;
@@ -57,24 +86,42 @@ class DiseaseSimulator {
             this.isRunning = true;
             this.timeStep = 0;
             this.totalInfected = 0;
+            this.milestoneEnd = false;
+            this.milestoneDeath = false;
+            this.initGrid();
+            this.rng.reseed(this.seed);
 
             // Infect first individual
             this.individuals[0].status = 'infected';
             this.totalInfected = 1;
 
+            // Canvas holds the intro text, so the first frame repaints every cell
+            this.renderer.clearSprites();
+            this.individuals.forEach((_, i) => this.changedCells.add(i));
+
             document.getElementById('startBtn').disabled = true;
             this.addTrace('🦠 Disease outbreak started in animal population', 'success');
-            this.addTrace(`Conditions: Density=${this.density}%, Domestication=${this.domestic}%, Virulence=${this.virulence}%`, 'info');
+            this.addTrace(`Conditions: Density=${this.density}%, Domestication=${this.domestic}%, Virulence=${this.virulence}%, Seed=${this.seed}`, 'info');
 
             if (this.domestic > 70) {
                 this.addTrace('⚠️  High domestication: Animal-to-human spillover risk!', 'warning');
             }
 
-            this.animate();
+            this.loop.start();
+        }
+    }
+
+    fastForward() {
+        const steps = parseInt(document.getElementById('fastForwardSteps').value) || 100;
+        this.startSimulation();
+        if (this.isRunning) {
+            const ran = this.loop.fastForward(steps);
+            this.addTrace(`⏩ Fast-forwarded ${ran} steps`, 'info');
         }
     }
 
     reset() {
+        this.loop.stop();
         this.isRunning = false;
         this.timeStep = 0;
         this.totalInfected = 0;
@@ -85,38 +132,46 @@ class DiseaseSimulator {
         document.getElementById('traceLog').innerHTML = '<p class="trace-item trace-info">Simulation reset.</p>';
     }
 
-    animate() {
-        if (!this.isRunning || this.timeStep > 500) {
-            this.isRunning = false;
-            document.getElementById('startBtn').disabled = false;
-            if (this.timeStep > 500) {
-                const surviving = this.individuals.filter(p => p.status !== 'dead').length;
-                this.addTrace(`✅ Simulation complete. ${surviving} survivors remaining.`, 'success');
-            }
-            return;
-        }
-
+    step() {
         this.timeStep++;
         this.updateDiseaseState();
-        this.updateStats();
-        this.drawSimulation();
 
         // Log major events
-        const currentInfected = this.individuals.filter(p => p.status === 'infected').length;
-        const currentImmune = this.individuals.filter(p => p.status === 'immune').length;
-        const currentDead = this.individuals.filter(p => p.status === 'dead').length;
+        const counts = this.countStatuses();
 
-        if (currentInfected === 0 && currentImmune > 10 && !this.milestoneEnd) {
+        if (counts.infected === 0 && counts.immune > 10 && !this.milestoneEnd) {
             this.milestoneEnd = true;
             this.addTrace(`🏥 Epidemic ended at step ${this.timeStep}. Population developed immunity.`, 'success');
         }
 
-        if (currentDead > (this.gridSize * this.gridSize) * 0.1 && !this.milestoneDeath) {
+        if (counts.dead > (this.gridSize * this.gridSize) * 0.1 && !this.milestoneDeath) {
             this.milestoneDeath = true;
             this.addTrace(`⚠️  High mortality: 10% of population dead`, 'warning');
         }
 
-        requestAnimationFrame(() => this.animate());
+        return this.timeStep <= this.maxSteps;
+    }
+
+    render() {
+        this.updateStats();
+        this.drawSimulation();
+    }
+
+    onComplete() {
+        this.isRunning = false;
+        document.getElementById('startBtn').disabled = false;
+        if (this.timeStep > this.maxSteps) {
+            const surviving = this.individuals.length - this.countStatuses().dead;
+            this.addTrace(`✅ Simulation complete. ${surviving} survivors remaining.`, 'success');
+        }
+    }
+
+    countStatuses() {
+        const counts = { healthy: 0, infected: 0, immune: 0, dead: 0 };
+        for (const person of this.individuals) {
+            counts[person.status]++;
+        }
+        return counts;
     }
 
     updateDiseaseState() {
@@ -129,14 +184,16 @@ class DiseaseSimulator {
                 person.timeInfected++;
 
                 // Check mortality
-                if (Math.random() < mortalityRate) {
+                if (this.rng.next() < mortalityRate) {
                     person.status = 'dead';
+                    this.changedCells.add(idx);
                     return;
                 }
 
                 // Check recovery
-                if (Math.random() < recoveryRate) {
+                if (this.rng.next() < recoveryRate) {
                     person.status = 'immune';
+                    this.changedCells.add(idx);
                     return;
                 }
 
@@ -144,8 +201,9 @@ class DiseaseSimulator {
                 const neighbors = this.getNeighbors(idx);
                 neighbors.forEach(nIdx => {
                     if (this.individuals[nIdx].status === 'healthy') {
-                        if (Math.random() < transmissionRate) {
+                        if (this.rng.next() < transmissionRate) {
                             this.individuals[nIdx].status = 'infected';
+                            this.changedCells.add(nIdx);
                             this.totalInfected++;
                         }
                     }
@@ -171,10 +229,7 @@ class DiseaseSimulator {
     }
 
     updateStats() {
-        const infected = this.individuals.filter(p => p.status === 'infected').length;
-        const immune = this.individuals.filter(p => p.status === 'immune').length;
-        const dead = this.individuals.filter(p => p.status === 'dead').length;
-        const healthy = this.individuals.filter(p => p.status === 'healthy').length;
+        const { infected, immune, dead } = this.countStatuses();
 
         const total = this.gridSize * this.gridSize;
         const infectionPct = (infected / total) * 100;
@@ -208,77 +263,65 @@ class DiseaseSimulator {
         this.ctx.fillText('Watch disease spread through the population', w / 2, h / 2 + 20);
     }
 
-    drawSimulation() {
-        const w = this.canvas.width;
-        const h = this.canvas.height;
+    drawGridLayer(ctx, w, h) {
         const cellSize = w / this.gridSize;
 
-        this.ctx.fillStyle = '#f9f7f4';
-        this.ctx.fillRect(0, 0, w, h);
-
-        // Draw individuals
-        for (let i = 0; i < this.individuals.length; i++) {
-            const row = Math.floor(i / this.gridSize);
-            const col = i % this.gridSize;
-            const x = col * cellSize;
-            const y = row * cellSize;
-
-            const person = this.individuals[i];
-            let color;
-
-            switch (person.status) {
-                case 'healthy':
-                    color = '#87CEEB';
-                    break;
-                case 'infected':
-                    color = '#DC143C';
-                    break;
-                case 'immune':
-                    color = '#228B22';
-                    break;
-                case 'dead':
-                    color = '#999';
-                    break;
-            }
-
-            this.ctx.fillStyle = color;
-            this.ctx.fillRect(x + 1, y + 1, cellSize - 2, cellSize - 2);
-        }
+        ctx.fillStyle = '#f9f7f4';
+        ctx.fillRect(0, 0, w, h);
 
         // Draw borders
-        this.ctx.strokeStyle = '#ddd';
-        this.ctx.lineWidth = 1;
+        ctx.strokeStyle = '#ddd';
+        ctx.lineWidth = 1;
         for (let i = 0; i <= this.gridSize; i++) {
-            this.ctx.beginPath();
-            this.ctx.moveTo(i * cellSize, 0);
-            this.ctx.lineTo(i * cellSize, h);
-            this.ctx.stroke();
-
-            this.ctx.beginPath();
-            this.ctx.moveTo(0, i * cellSize);
-            this.ctx.lineTo(w, i * cellSize);
-            this.ctx.stroke();
+            ctx.beginPath();
+            ctx.moveTo(i * cellSize, 0);
+            ctx.lineTo(i * cellSize, h);
+            ctx.stroke();
+
+            ctx.beginPath();
+            ctx.moveTo(0, i * cellSize);
+            ctx.lineTo(w, i * cellSize);
+            ctx.stroke();
         }
 
         // Legend
-        this.ctx.font = '12px Georgia';
-        this.ctx.fillStyle = '#2c3e50';
-        this.ctx.textAlign = 'left';
-        this.ctx.fillText('Step: ' + this.timeStep, 10, h + 20);
-        this.ctx.fillStyle = '#87CEEB';
-        this.ctx.fillRect(150, h + 5, 12, 12);
-        this.ctx.fillStyle = '#2c3e50';
-        this.ctx.fillText('Healthy', 165, h + 14);
-
-        this.ctx.fillStyle = '#DC143C';
-        this.ctx.fillRect(280, h + 5, 12, 12);
-        this.ctx.fillStyle = '#2c3e50';
-        this.ctx.fillText('Infected', 295, h + 14);
-
-        this.ctx.fillStyle = '#228B22';
-        this.ctx.fillRect(390, h + 5, 12, 12);
-        this.ctx.fillStyle = '#2c3e50';
-        this.ctx.fillText('Immune', 405, h + 14);
+        ctx.font = '12px Georgia';
+        ctx.textAlign = 'left';
+        ctx.fillStyle = STATUS_COLORS.healthy;
+        ctx.fillRect(150, h + 5, 12, 12);
+        ctx.fillStyle = '#2c3e50';
+        ctx.fillText('Healthy', 165, h + 14);
+
+        ctx.fillStyle = STATUS_COLORS.infected;
+        ctx.fillRect(280, h + 5, 12, 12);
+        ctx.fillStyle = '#2c3e50';
+        ctx.fillText('Infected', 295, h + 14);
+
+        ctx.fillStyle = STATUS_COLORS.immune;
+        ctx.fillRect(390, h + 5, 12, 12);
+        ctx.fillStyle = '#2c3e50';
+        ctx.fillText('Immune', 405, h + 14);
+    }
+
+    setCellSprite(i) {
+        const cellSize = this.canvas.width / this.gridSize;
+        const x = (i % this.gridSize) * cellSize + 1;
+        const y = Math.floor(i / this.gridSize) * cellSize + 1;
+        const size = cellSize - 2;
+        const status = this.individuals[i].status;
+        const color = STATUS_COLORS[status];
+
+        this.renderer.setSprite(i, { x, y, w: size, h: size }, status, (ctx) => {
+            ctx.fillStyle = color;
+            ctx.fillRect(x, y, size, size);
+        });
+    }
+
+    drawSimulation() {
+        // Only cells whose status changed since the last frame are repainted
+        this.changedCells.forEach(i => this.setCellSprite(i));
+        this.changedCells.clear();
+        this.renderer.render();
     }
 
     addTrace(message, type = 'info') {
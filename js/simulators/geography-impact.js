@@ -10,6 +10,13 @@ class GeographySimulator {
         this.isRunning = false;
         this.timeStep = 0;
         this.regions = [];
+        this.maxSteps = 300;
+        this.loop = new SimulationLoop({
+            step: () => this.step(),
+            render: () => this.render(),
+            onComplete: () => this.onComplete()
+        });
+        this.renderer = new DirtyRegionRenderer(this.canvas);
 
         this.initControls();
         this.drawInitialState();
@@ -31,6 +38,7 @@ class GeographySimulator {
         });
 
         document.getElementById('startBtn').addEventListener('click', () => this.startSimulation());
+        document.getElementById('fastForwardBtn').addEventListener('click', () => this.fastForward());
         document.getElementById('resetBtn').addEventListener('click', () => this.reset());
 
         this.axis = 'ew';
@@ -44,6 +52,10 @@ class GeographySimulator {
             this.timeStep = 0;
             this.setupRegions();
 
+            // Connections depend on the layout, so the static layer is rebuilt per run
+            this.renderer.clearSprites();
+            this.renderer.setStaticLayer((ctx, w, h) => this.drawMapLayer(ctx, w, h));
+
             document.getElementById('startBtn').disabled = true;
             this.addTrace('🚀 Starting technology diffusion simulation', 'success');
 
@@ -55,7 +67,16 @@ class GeographySimulator {
                 this.addTrace('⚠️  Fragmented geography: Isolated regions develop separately', 'warning');
             }
 
-            this.animate();
+            this.loop.start();
+        }
+    }
+
+    fastForward() {
+        const steps = parseInt(document.getElementById('fastForwardSteps').value) || 100;
+        this.startSimulation();
+        if (this.isRunning) {
+            const ran = this.loop.fastForward(steps);
+            this.addTrace(`⏩ Fast-forwarded ${ran} years`, 'info');
         }
     }
 
@@ -104,27 +125,28 @@ class GeographySimulator {
         }
     }
 
-    animate() {
-        if (!this.isRunning || this.timeStep > 300) {
-            this.isRunning = false;
-            document.getElementById('startBtn').disabled = false;
-            if (this.timeStep > 300) {
-                const allAdopted = this.regions.every(r => r.tech > 0.8);
-                if (allAdopted) {
-                    this.addTrace('✅ Technology diffused to all regions!', 'success');
-                } else {
-                    this.addTrace('⏸️  Simulation complete. Some regions isolated.', 'info');
-                }
-            }
-            return;
-        }
-
+    step() {
         this.timeStep++;
         this.updateDiffusion();
+        return this.timeStep <= this.maxSteps;
+    }
+
+    render() {
         this.updateStats();
         this.drawSimulation();
+    }
 
-        requestAnimationFrame(() => this.animate());
+    onComplete() {
+        this.isRunning = false;
+        document.getElementById('startBtn').disabled = false;
+        if (this.timeStep > this.maxSteps) {
+            const allAdopted = this.regions.every(r => r.tech > 0.8);
+            if (allAdopted) {
+                this.addTrace('✅ Technology diffused to all regions!', 'success');
+            } else {
+                this.addTrace('⏸️  Simulation complete. Some regions isolated.', 'info');
+            }
+        }
     }
 
     updateDiffusion() {
@@ -220,64 +242,75 @@ class GeographySimulator {
         this.ctx.fillText('Watch technology spread through regions', w / 2, h / 2 + 20);
     }
 
-    drawSimulation() {
-        const w = this.canvas.width;
-        const h = this.canvas.height;
-
-        this.ctx.fillStyle = '#f9f7f4';
-        this.ctx.fillRect(0, 0, w, h);
+    drawMapLayer(ctx, w, h) {
+        ctx.fillStyle = '#f9f7f4';
+        ctx.fillRect(0, 0, w, h);
 
         // Draw connections
-        this.ctx.strokeStyle = '#ddd';
-        this.ctx.lineWidth = 1;
+        ctx.strokeStyle = '#ddd';
+        ctx.lineWidth = 1;
         for (let i = 0; i < this.regions.length - 1; i++) {
             const r1 = this.regions[i];
             const r2 = this.regions[i + 1];
-            this.ctx.beginPath();
-            this.ctx.moveTo(r1.x, r1.y);
-            this.ctx.lineTo(r2.x, r2.y);
-            this.ctx.stroke();
+            ctx.beginPath();
+            ctx.moveTo(r1.x, r1.y);
+            ctx.lineTo(r2.x, r2.y);
+            ctx.stroke();
         }
+    }
+
+    drawSimulation() {
+        const radius = 30;
 
-        // Draw regions with tech adoption
+        // Draw regions with tech adoption; a region only repaints when its
+        // drawn opacity (1/255 steps) changes
         this.regions.forEach((region, idx) => {
-            const radius = 30;
-
-            // Background
-            this.ctx.fillStyle = `rgba(135, 206, 235, ${region.tech * 0.5 + 0.2})`;
-            this.ctx.beginPath();
-            this.ctx.arc(region.x, region.y, radius, 0, Math.PI * 2);
-            this.ctx.fill();
-
-            // Tech level indicator
-            this.ctx.fillStyle = `rgba(65, 105, 225, ${region.tech})`;
-            this.ctx.beginPath();
-            this.ctx.arc(region.x, region.y, radius * region.tech, 0, Math.PI * 2);
-            this.ctx.fill();
-
-            // Border
-            this.ctx.strokeStyle = '#8B4513';
-            this.ctx.lineWidth = 2;
-            this.ctx.beginPath();
-            this.ctx.arc(region.x, region.y, radius, 0, Math.PI * 2);
-            this.ctx.stroke();
-
-            // Label
-            this.ctx.fillStyle = '#2c3e50';
-            this.ctx.font = 'bold 12px system-ui';
-            this.ctx.textAlign = 'center';
-            this.ctx.textBaseline = 'middle';
-            this.ctx.fillText(`R${idx + 1}`, region.x, region.y - 45);
+            const tech = region.tech;
+            const bounds = { x: region.x - radius, y: region.y - 55, w: radius * 2, h: 55 + radius };
+
+            this.renderer.setSprite(`region${idx}`, bounds, Math.round(tech * 255), (ctx) => {
+                // Background
+                ctx.fillStyle = `rgba(135, 206, 235, ${tech * 0.5 + 0.2})`;
+                ctx.beginPath();
+                ctx.arc(region.x, region.y, radius, 0, Math.PI * 2);
+                ctx.fill();
+
+                // Tech level indicator
+                ctx.fillStyle = `rgba(65, 105, 225, ${tech})`;
+                ctx.beginPath();
+                ctx.arc(region.x, region.y, radius * tech, 0, Math.PI * 2);
+                ctx.fill();
+
+                // Border
+                ctx.strokeStyle = '#8B4513';
+                ctx.lineWidth = 2;
+                ctx.beginPath();
+                ctx.arc(region.x, region.y, radius, 0, Math.PI * 2);
+                ctx.stroke();
+
+                // Label
+                ctx.fillStyle = '#2c3e50';
+                ctx.font = 'bold 12px system-ui';
+                ctx.textAlign = 'center';
+                ctx.textBaseline = 'middle';
+                ctx.fillText(`R${idx + 1}`, region.x, region.y - 45);
+            });
         });
 
         // Info
-        this.ctx.font = '12px Georgia';
-        this.ctx.fillStyle = '#2c3e50';
-        this.ctx.textAlign = 'left';
-        this.ctx.fillText(`Time: ${this.timeStep} years`, 10, 30);
+        const timeStep = this.timeStep;
+        this.renderer.setSprite('time', { x: 8, y: 14, w: 160, h: 22 }, timeStep, (ctx) => {
+            ctx.font = '12px Georgia';
+            ctx.fillStyle = '#2c3e50';
+            ctx.textAlign = 'left';
+            ctx.fillText(`Time: ${timeStep} years`, 10, 30);
+        });
+
+        this.renderer.render();
     }
 
     reset() {
+        this.loop.stop();
         this.isRunning = false;
         this.timeStep = 0;
         this.regions = [];
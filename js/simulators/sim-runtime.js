@@ -0,0 +1,123 @@
+/**
+ * Simulation Runtime
+ * Fixed-timestep update loop, decoupled rendering and seeded randomness
+ * shared by all simulators
+ */
+
+/**
+ * Small, fast seeded PRNG (mulberry32) so runs can be replayed exactly
+ */
+class SeededRandom {
+    constructor(seed = 1) {
+        this.reseed(seed);
+    }
+
+    reseed(seed) {
+        this.seed = seed >>> 0;
+        this.state = this.seed;
+    }
+
+    // Uniform float in [0, 1), drop-in for Math.random()
+    next() {
+        let t = (this.state = (this.state + 0x6D2B79F5) >>> 0);
+        t = Math.imul(t ^ (t >>> 15), t | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    }
+}
+
+/**
+ * Runs step() at a fixed rate and render() at most once per display frame.
+ *
+ * step() advances the simulation by one tick and returns false when the
+ * simulation is finished. render() only reads state, so any number of
+ * steps can run between two renders (or none, when the display is faster
+ * than the tick rate).
+ */
+class SimulationLoop {
+    constructor({ step, render, onComplete = () => {}, stepsPerSecond = 60, maxStepsPerFrame = 240 }) {
+        this.step = step;
+        this.render = render;
+        this.onComplete = onComplete;
+        this.stepMs = 1000 / stepsPerSecond;
+        this.maxStepsPerFrame = maxStepsPerFrame;
+        this.running = false;
+        this.accumulator = 0;
+        this.lastTime = null;
+        this.frameHandle = null;
+    }
+
+    start() {
+        if (this.running) return;
+        this.running = true;
+        this.accumulator = 0;
+        this.lastTime = null;
+        this.frameHandle = requestAnimationFrame((t) => this.frame(t));
+    }
+
+    stop() {
+        this.running = false;
+        if (this.frameHandle !== null) {
+            cancelAnimationFrame(this.frameHandle);
+            this.frameHandle = null;
+        }
+    }
+
+    /**
+     * Run up to n ticks synchronously without rendering, then render once.
+     * Returns the number of ticks actually run.
+     */
+    fastForward(n) {
+        let ran = 0;
+        let finished = false;
+        while (ran < n) {
+            ran++;
+            if (this.step() === false) {
+                finished = true;
+                break;
+            }
+        }
+        this.render();
+        if (finished) this.finish();
+        return ran;
+    }
+
+    frame(timestamp) {
+        if (!this.running) return;
+
+        if (this.lastTime === null) {
+            // First frame runs exactly one tick so the display reacts at once
+            this.lastTime = timestamp;
+            this.accumulator = this.stepMs;
+        } else {
+            this.accumulator += timestamp - this.lastTime;
+            this.lastTime = timestamp;
+        }
+
+        let steps = 0;
+        let finished = false;
+        while (this.accumulator >= this.stepMs && steps < this.maxStepsPerFrame) {
+            this.accumulator -= this.stepMs;
+            steps++;
+            if (this.step() === false) {
+                finished = true;
+                break;
+            }
+        }
+        // After a stall (background tab), drop the backlog instead of spiralling
+        if (steps >= this.maxStepsPerFrame) this.accumulator = 0;
+
+        if (steps > 0) this.render();
+
+        if (finished) {
+            this.finish();
+        } else {
+            this.frameHandle = requestAnimationFrame((t) => this.frame(t));
+        }
+    }
+
+    finish() {
+        this.stop();
+        this.onComplete();
+    }
+}
@@ -0,0 +1,92 @@
+/**
+ * Reader Telemetry
+ * Batches page-load and resource timings and beacons them to server.py
+ */
+
+class ReaderTelemetry {
+    constructor({ endpoint = 'api/telemetry', batchSize = 20, flushInterval = 10000, maxQueue = 500 } = {}) {
+        this.endpoint = endpoint;
+        this.batchSize = batchSize;
+        this.maxQueue = maxQueue;
+        this.queue = [];
+
+        // Only over http(s) with beacon support, and readers can opt out
+        this.enabled = location.protocol.startsWith('http')
+            && typeof navigator.sendBeacon === 'function'
+            && localStorage.getItem('ggs_telemetry') !== 'off';
+        if (!this.enabled) return;
+
+        this.observeResources();
+        this.recordNavigation();
+        setInterval(() => this.flush(), flushInterval);
+
+        // Last chance to send before the tab goes away
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'hidden') this.flush();
+        });
+        window.addEventListener('pagehide', () => this.flush());
+    }
+
+    /**
+     * Queue one timing in milliseconds. fields may carry page, trigger,
+     * view, lang or resource.
+     */
+    record(metric, ms, fields = {}) {
+        if (!this.enabled || !(ms >= 0)) return;
+        if (this.queue.length >= this.maxQueue) this.queue.shift();
+        this.queue.push({ metric, ms: Math.round(ms * 10) / 10, ...fields });
+        if (this.queue.length >= this.batchSize) this.flush();
+    }
+
+    flush() {
+        if (!this.enabled || this.queue.length === 0) return;
+        const events = this.queue.splice(0, this.queue.length);
+        // A string body goes out as text/plain, which needs no CORS preflight
+        navigator.sendBeacon(this.endpoint, JSON.stringify({ events }));
+    }
+
+    observeResources() {
+        if (typeof PerformanceObserver === 'undefined') return;
+        try {
+            const observer = new PerformanceObserver((list) => {
+                list.getEntries().forEach(entry => this.recordResource(entry));
+            });
+            observer.observe({ type: 'resource', buffered: true });
+        } catch (error) {
+            // Older browsers without resource timing: page-load spans still work
+        }
+    }
+
+    recordResource(entry) {
+        const path = new URL(entry.name, location.href).pathname;
+        if (path.includes('/api/')) return;
+
+        let resource = 'other';
+        if (path.includes('/text/')) resource = 'text';
+        else if (path.includes('/pages/')) resource = 'image';
+        else if (path.endsWith('.js')) resource = 'script';
+        else if (path.endsWith('.css')) resource = 'style';
+        else if (path.endsWith('.json')) resource = 'data';
+
+        const fields = { resource };
+        const match = path.match(/page_(\d{4})/);
+        if (match) fields.page = parseInt(match[1]);
+        this.record('resource', entry.duration, fields);
+    }
+
+    recordNavigation() {
+        const report = () => {
+            const [nav] = performance.getEntriesByType('navigation');
+            if (!nav) return;
+            this.record('navigation', nav.responseEnd - nav.startTime, { trigger: 'initial' });
+            this.record('dom-content-loaded', nav.domContentLoadedEventEnd - nav.startTime, { trigger: 'initial' });
+            this.record('load', nav.loadEventEnd - nav.startTime, { trigger: 'initial' });
+        };
+        // loadEventEnd is only set once the load handlers have returned
+        if (document.readyState === 'complete') {
+            setTimeout(report, 0);
+        } else {
+            window.addEventListener('load', () => setTimeout(report, 0), { once: true });
+        }
+    }
+}
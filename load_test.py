@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Concurrent Reader Load Test
+Replays realistic reader sessions against the local study-guide server
+Uses only built-in Python libraries - no external dependencies
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+# ============================================================================
+# SESSION MODEL
+# ============================================================================
+
+TOTAL_PAGES = 457
+
+# Assets the reader shell pulls in on first load
+READER_ASSETS = [
+    'reader.html',
+    'css/reader.css',
+    'js/telemetry.js',
+    'js/page-delta.js',
+    'js/reader.js',
+    'related_pages.json',
+]
+
+SIMULATORS = [
+    'agricultural-advantage',
+    'disease-transmission',
+    'geography-impact',
+]
+
+# Probabilities applied on every page turn
+LANGUAGE_TOGGLE_CHANCE = 0.05
+VIEW_TOGGLE_CHANCE = 0.08
+SIMULATOR_VISIT_CHANCE = 0.02
+
+# js/telemetry.js beacons its queue once it holds this many events
+TELEMETRY_BATCH = 20
+
+
+def page_url(page_num: int, language: str) -> str:
+    """URL of a text page in the given language"""
+    suffix = '_ro' if language == 'ro' else ''
+    return f'text/page_{page_num:04d}{suffix}.html'
+
+
+def image_url(page_num: int) -> str:
+    """URL of a scanned page image"""
+    return f'pages/page_{page_num:04d}.png'
+
+
+def telemetry_events(resource: str, path: str, latency: float) -> List[Dict]:
+    """Events the reader's telemetry queues for one request"""
+    ms = round(latency * 1000, 1)
+    if path.startswith('text/'):
+        kind = 'text'
+    elif path.startswith('pages/'):
+        kind = 'image'
+    else:
+        kind = {'.js': 'script', '.css': 'style', '.json': 'data'}.get(path[path.rfind('.'):], 'other')
+    events = [{'metric': 'resource', 'ms': ms, 'resource': kind}]
+    if resource.startswith('page_'):
+        # Page-load spans; parse and render happen in the browser and are not modelled
+        events += [{'metric': metric, 'ms': ms, 'trigger': 'navigate'} for metric in ('fetch', 'total')]
+    return events
+
+
+class ReaderSession:
+    """Generates the request sequence of one simulated reader"""
+
+    def __init__(self, rng: random.Random, pages_per_session: int):
+        self.rng = rng
+        self.pages_per_session = pages_per_session
+        self.language = 'ro' if rng.random() < 0.3 else 'en'
+        self.view = 'image' if rng.random() < 0.2 else 'text'
+
+    def requests(self):
+        """Yield (resource_type, path) pairs in the order a reader issues them"""
+        for asset in READER_ASSETS:
+            yield 'static', asset
+
+        page = self.rng.randint(1, TOTAL_PAGES)
+        for _ in range(self.pages_per_session):
+            if self.rng.random() < LANGUAGE_TOGGLE_CHANCE:
+                self.language = 'ro' if self.language == 'en' else 'en'
+            if self.rng.random() < VIEW_TOGGLE_CHANCE:
+                self.view = 'image' if self.view == 'text' else 'text'
+
+            # The reader fetches the text page even in image view
+            resource = 'page_ro' if self.language == 'ro' else 'page_en'
+            yield resource, page_url(page, self.language)
+            if self.view == 'image':
+                yield 'image', image_url(page)
+
+            if self.rng.random() < SIMULATOR_VISIT_CHANCE:
+                name = self.rng.choice(SIMULATORS)
+                yield 'simulator', f'simulators/{name}.html'
+                yield 'simulator', 'css/simulators.css'
+                yield 'simulator', 'js/simulators/sim-runtime.js'
+                yield 'simulator', 'js/simulators/canvas-renderer.js'
+                yield 'simulator', f'js/simulators/{name}.js'
+
+            page = page + 1 if page < TOTAL_PAGES else 1
+
+# ============================================================================
+# STATISTICS
+# ============================================================================
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class LoadStats:
+    """Thread-safe per-resource-type latency and error accounting"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.bytes: Dict[str, int] = {}
+
+    def record(self, resource: str, latency: float, size: int, ok: bool):
+        with self.lock:
+            self.latencies.setdefault(resource, []).append(latency)
+            self.bytes[resource] = self.bytes.get(resource, 0) + size
+            if not ok:
+                self.errors[resource] = self.errors.get(resource, 0) + 1
+
+    def summary(self, elapsed: float) -> Dict:
+        """Aggregate results into a JSON-serialisable report"""
+        report = {'elapsed_s': round(elapsed, 3), 'resources': {}}
+        all_latencies = []
+        total_errors = 0
+        total_bytes = 0
+
+        for resource in sorted(self.latencies):
+            values = sorted(self.latencies[resource])
+            errors = self.errors.get(resource, 0)
+            all_latencies.extend(values)
+            total_errors += errors
+            total_bytes += self.bytes.get(resource, 0)
+            report['resources'][resource] = self._describe(values, errors, self.bytes.get(resource, 0), elapsed)
+
+        all_latencies.sort()
+        report['total'] = self._describe(all_latencies, total_errors, total_bytes, elapsed)
+        return report
+
+    @staticmethod
+    def _describe(values: List[float], errors: int, size: int, elapsed: float) -> Dict:
+        count = len(values)
+        return {
+            'requests': count,
+            'errors': errors,
+            'error_rate': round(errors / count, 4) if count else 0.0,
+            'throughput_rps': round(count / elapsed, 2) if elapsed else 0.0,
+            'throughput_mbps': round(size / elapsed / 1e6, 3) if elapsed else 0.0,
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+        }
+
+# ============================================================================
+# LOAD GENERATOR
+# ============================================================================
+
+class LoadTester:
+    """Runs N concurrent reader sessions against a base URL"""
+
+    def __init__(self, base_url: str, clients: int, duration: float,
+                 pages_per_session: int, think_time: float, seed: int, timeout: float,
+                 telemetry: bool = False):
+        self.base_url = base_url.rstrip('/') + '/'
+        self.clients = clients
+        self.duration = duration
+        self.pages_per_session = pages_per_session
+        self.think_time = think_time
+        self.seed = seed
+        self.timeout = timeout
+        self.telemetry = telemetry
+        self.stats = LoadStats()
+        self.stop_event = threading.Event()
+        # Second connection for the reader's parallel delta + source fetch
+        self.fallback_pool = ThreadPoolExecutor(max_workers=clients)
+
+    def fetch(self, path: str) -> Tuple[bool, int, int]:
+        """GET a path and read the full body, returning (ok, bytes, status)"""
+        try:
+            with urllib.request.urlopen(self.base_url + path, timeout=self.timeout) as response:
+                body = response.read()
+                return 200 <= response.status < 300, len(body), response.status
+        except urllib.error.HTTPError as e:
+            return False, 0, e.code
+        except (urllib.error.URLError, OSError):
+            return False, 0, 0
+
+    def fetch_translated_fallback(self, path: str) -> Tuple[bool, int]:
+        """Fetch a missing translated page's delta and English source together
+
+        Mirrors fetchPageContent in js/reader.js. The English page is shown
+        when the delta is missing, so only the source decides success.
+        """
+        # text/page_0050_ro.html → page_0050_ro.delta.json and page_0050.html
+        delta = self.fallback_pool.submit(self.fetch, path[:-len('.html')] + '.delta.json')
+        source_ok, source_size, _ = self.fetch(path[:path.rindex('_')] + '.html')
+        _, delta_size, _ = delta.result()
+        return source_ok, source_size + delta_size
+
+    def post_telemetry(self, events: List[Dict]):
+        """Send one beacon batch to /api/telemetry, as js/telemetry.js does"""
+        body = json.dumps({'events': events}).encode('utf-8')
+        request = urllib.request.Request(self.base_url + 'api/telemetry', data=body,
+                                         headers={'Content-Type': 'text/plain'})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                ok = 200 <= response.status < 300
+        except (urllib.error.URLError, OSError):
+            ok = False
+        self.stats.record('telemetry', time.perf_counter() - start, len(body), ok)
+
+    def run_client(self, client_id: int):
+        """Replay sessions back to back until the deadline"""
+        rng = random.Random(self.seed * 100003 + client_id)
+        while not self.stop_event.is_set():
+            session = ReaderSession(rng, self.pages_per_session)
+            events = []
+            for resource, path in session.requests():
+                if self.stop_event.is_set():
+                    return
+                start = time.perf_counter()
+                ok, size, status = self.fetch(path)
+                if resource == 'page_ro' and status == 404:
+                    ok, size = self.fetch_translated_fallback(path)
+                latency = time.perf_counter() - start
+                self.stats.record(resource, latency, size, ok)
+                # Simulator pages do not load the telemetry script
+                if self.telemetry and resource != 'simulator':
+                    events += telemetry_events(resource, path, latency)
+                    if len(events) >= TELEMETRY_BATCH:
+                        self.post_telemetry(events)
+                        events = []
+                if self.think_time:
+                    time.sleep(rng.uniform(0, 2 * self.think_time))
+            if events:
+                # The reader flushes when the tab is hidden
+                self.post_telemetry(events)
+
+    def run(self) -> Dict:
+        threads = [
+            threading.Thread(target=self.run_client, args=(i,), daemon=True)
+            for i in range(self.clients)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        self.stop_event.wait(self.duration)
+        self.stop_event.set()
+        for thread in threads:
+            thread.join(self.timeout + 1)
+        self.fallback_pool.shutdown(wait=False)
+
+        return self.stats.summary(time.perf_counter() - start)
+
+
+def print_report(report: Dict):
+    """Pretty-print a load test report"""
+    print(f"\n{'='*90}")
+    print(f"📊 LOAD TEST RESULTS ({report['elapsed_s']:.1f}s)")
+    print(f"{'='*90}")
+    header = f"{'resource':<12}{'reqs':>8}{'err %':>8}{'req/s':>10}{'MB/s':>9}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}"
+    print(header)
+    print(f"{'-'*90}")
+    rows = list(report['resources'].items()) + [('TOTAL', report['total'])]
+    for name, row in rows:
+        print(f"{name:<12}{row['requests']:>8}{row['error_rate']*100:>7.2f}%"
+              f"{row['throughput_rps']:>10.1f}{row['throughput_mbps']:>9.2f}"
+              f"{row['p50_ms']:>11.2f}{row['p95_ms']:>11.2f}{row['p99_ms']:>11.2f}")
+    print(f"{'='*90}\n")
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay concurrent reader sessions against the study-guide server')
+    parser.add_argument('--url', default='http://localhost:8000/', help='Base URL of the server')
+    parser.add_argument('--clients', type=int, default=30, help='Number of concurrent readers')
+    parser.add_argument('--duration', type=float, default=30.0, help='Test length in seconds')
+    parser.add_argument('--pages', type=int, default=20, help='Page turns per reader session')
+    parser.add_argument('--think', type=float, default=0.0, help='Mean pause between requests in seconds')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for reproducible session mixes')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Per-request timeout in seconds')
+    parser.add_argument('--telemetry', action='store_true',
+                        help='Also send the telemetry beacons the reader posts to /api/telemetry')
+    parser.add_argument('--json', dest='json_path', help='Also write the report to this JSON file')
+    args = parser.parse_args()
+
+    print(f"🚦 {args.clients} readers → {args.url} for {args.duration:.0f}s (seed {args.seed})")
+    tester = LoadTester(args.url, args.clients, args.duration, args.pages,
+                        args.think, args.seed, args.timeout, args.telemetry)
+    report = tester.run()
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json_path}")
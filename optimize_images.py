@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Page Scan Optimizer
+Lossless PNG recompression with grayscale/bilevel conversion of colorless scans
+Uses only built-in Python libraries - no external dependencies
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# ============================================================================
+# PNG DECODING
+# ============================================================================
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+COLOR_GRAY = 0
+COLOR_RGB = 2
+
+FILTER_NONE, FILTER_SUB, FILTER_UP, FILTER_AVERAGE, FILTER_PAETH = range(5)
+
+
+class Image(NamedTuple):
+    """Decoded 8-bit image: one bytes object of packed pixels per row"""
+    width: int
+    height: int
+    channels: int
+    rows: List[bytes]
+
+
+def _masks(length: int) -> Tuple[int, int]:
+    """0x80 and 0x7F repeated over `length` bytes, for bytewise big-int math"""
+    high = int.from_bytes(b'\x80' * length, 'big')
+    return high, high ^ int.from_bytes(b'\xff' * length, 'big')
+
+
+def bytewise_add(a: bytes, b: bytes) -> bytes:
+    """(a[i] + b[i]) mod 256 for every byte, computed as one big-int operation"""
+    high, low = _masks(len(a))
+    x, y = int.from_bytes(a, 'big'), int.from_bytes(b, 'big')
+    return (((x & low) + (y & low)) ^ ((x ^ y) & high)).to_bytes(len(a), 'big')
+
+
+def bytewise_sub(a: bytes, b: bytes) -> bytes:
+    """(a[i] - b[i]) mod 256 for every byte, computed as one big-int operation"""
+    high, low = _masks(len(a))
+    x, y = int.from_bytes(a, 'big'), int.from_bytes(b, 'big')
+    return (((x | high) - (y & low)) ^ ((x ^ y ^ high) & high)).to_bytes(len(a), 'big')
+
+
+def _unfilter_row(kind: int, row: bytes, prev: bytes, bpp: int) -> bytes:
+    if kind == FILTER_NONE:
+        return row
+    if kind == FILTER_UP:
+        return bytewise_add(row, prev)
+    if kind == FILTER_SUB:
+        # Independent running sums per channel
+        out = bytearray(len(row))
+        for channel in range(bpp):
+            out[channel::bpp] = bytes(
+                value & 0xFF for value in accumulate(row[channel::bpp])
+            )
+        return bytes(out)
+
+    out = bytearray(row)
+    if kind == FILTER_AVERAGE:
+        for i in range(len(out)):
+            left = out[i - bpp] if i >= bpp else 0
+            out[i] = (out[i] + ((left + prev[i]) >> 1)) & 0xFF
+    elif kind == FILTER_PAETH:
+        for i in range(len(out)):
+            if i >= bpp:
+                a, c = out[i - bpp], prev[i - bpp]
+            else:
+                a = c = 0
+            b = prev[i]
+            p = a + b - c
+            pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+            if pa <= pb and pa <= pc:
+                predictor = a
+            elif pb <= pc:
+                predictor = b
+            else:
+                predictor = c
+            out[i] = (out[i] + predictor) & 0xFF
+    else:
+        raise ValueError(f'unknown PNG filter type {kind}')
+    return bytes(out)
+
+
+def unpack_bilevel(row: bytes, width: int) -> bytes:
+    """1-bit packed row into one 0/255 byte per pixel"""
+    bits = bin(int.from_bytes(row, 'big'))[2:].zfill(len(row) * 8)[:width]
+    return bits.encode('ascii').translate(BITS_TO_GRAY)
+
+
+BITS_TO_GRAY = bytes(255 if i == ord('1') else 0 for i in range(256))
+
+
+def decode_png(data: bytes) -> Image:
+    """Decode a non-interlaced 8-bit RGB/gray or 1-bit gray PNG"""
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError('not a PNG file')
+    pos, idat, header = len(PNG_SIGNATURE), [], None
+    while pos < len(data):
+        length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        if kind == b'IHDR':
+            header = struct.unpack('>IIBBBBB', body)
+        elif kind == b'IDAT':
+            idat.append(body)
+        elif kind == b'IEND':
+            break
+        pos += 12 + length
+
+    width, height, depth, color, _, _, interlace = header
+    channels = {COLOR_GRAY: 1, COLOR_RGB: 3}.get(color)
+    if channels is None or interlace or depth not in (1, 8) or (depth == 1 and color != COLOR_GRAY):
+        raise ValueError(f'unsupported PNG (color type {color}, depth {depth}, interlace {interlace})')
+
+    raw = zlib.decompress(b''.join(idat))
+    stride = (width * channels * depth + 7) // 8
+    bpp = max(1, channels * depth // 8)
+    rows, prev = [], bytes(stride)
+    for y in range(height):
+        start = y * (stride + 1)
+        prev = _unfilter_row(raw[start], raw[start + 1:start + 1 + stride], prev, bpp)
+        rows.append(prev)
+    if depth == 1:
+        rows = [unpack_bilevel(row, width) for row in rows]
+    return Image(width, height, channels, rows)
+
+# ============================================================================
+# PNG ENCODING
+# ============================================================================
+
+def _chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+
+
+def _filter_rows(rows: List[bytes], bpp: int, mode: str) -> bytes:
+    """Filtered scanlines using None/Sub/Up, uniformly or chosen per row
+
+    'adaptive' picks, per row, the filter leaving the most zero bytes, which
+    is what compresses best on scans of mostly blank paper.
+    """
+    out, prev = [], bytes(len(rows[0]))
+    for row in rows:
+        candidates = {
+            FILTER_NONE: row,
+            FILTER_SUB: bytewise_sub(row, bytes(bpp) + row[:-bpp]) if mode in ('sub', 'adaptive') else None,
+            FILTER_UP: bytewise_sub(row, prev) if mode in ('up', 'adaptive') else None,
+        }
+        if mode == 'adaptive':
+            kind = max((k for k in candidates), key=lambda k: candidates[k].count(0))
+        else:
+            kind = {'none': FILTER_NONE, 'sub': FILTER_SUB, 'up': FILTER_UP}[mode]
+        out.append(bytes((kind,)) + candidates[kind])
+        prev = row
+    return b''.join(out)
+
+
+FILTER_MODES = ('none', 'sub', 'up', 'adaptive')
+ZLIB_STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)
+
+
+def encode_png(width: int, height: int, color: int, depth: int, rows: List[bytes]) -> bytes:
+    """Smallest PNG over every filter mode and zlib strategy at level 9"""
+    bpp = max(1, (1 if color == COLOR_GRAY else 3) * depth // 8)
+    best = None
+    for mode in FILTER_MODES:
+        scanlines = _filter_rows(rows, bpp, mode)
+        for strategy in ZLIB_STRATEGIES:
+            compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+            data = compressor.compress(scanlines) + compressor.flush()
+            if best is None or len(data) < len(best):
+                best = data
+    header = struct.pack('>IIBBBBB', width, height, depth, color, 0, 0, 0)
+    return PNG_SIGNATURE + _chunk(b'IHDR', header) + _chunk(b'IDAT', best) + _chunk(b'IEND', b'')
+
+
+GRAY_TO_BITS = bytes(ord('1') if i == 255 else ord('0') for i in range(256))
+
+
+def pack_bilevel(row: bytes) -> bytes:
+    """0/255 bytes into a 1-bit packed row, padded to a whole byte"""
+    bits = row.translate(GRAY_TO_BITS).decode('ascii')
+    bits += '0' * (-len(bits) % 8)
+    return int(bits, 2).to_bytes(len(bits) // 8, 'big')
+
+# ============================================================================
+# CONVERSION
+# ============================================================================
+
+def to_grayscale(image: Image, tolerance: int) -> Optional[List[bytes]]:
+    """Gray rows if no pixel's channels differ by more than tolerance"""
+    gray_rows = []
+    for row in image.rows:
+        red, green, blue = row[0::3], row[1::3], row[2::3]
+        if not (red == green == blue):
+            if tolerance == 0:
+                return None
+            for r, g, b in zip(red, green, blue):
+                if abs(r - g) > tolerance or abs(b - g) > tolerance:
+                    return None
+        gray_rows.append(green)
+    return gray_rows
+
+
+def to_bilevel(gray_rows: List[bytes], tolerance: int) -> Optional[List[bytes]]:
+    """0/255 rows if every gray value is within tolerance of black or white"""
+    snap = bytes(0 if v <= tolerance else 255 if v >= 255 - tolerance else v for v in range(256))
+    rows = []
+    for row in gray_rows:
+        snapped = row.translate(snap)
+        if snapped.translate(None, b'\x00\xff'):
+            return None
+        rows.append(snapped)
+    return rows
+
+
+def expand_to_rgb(image: Image) -> List[bytes]:
+    if image.channels == 3:
+        return image.rows
+    rows = []
+    for row in image.rows:
+        rgb = bytearray(len(row) * 3)
+        rgb[0::3] = rgb[1::3] = rgb[2::3] = row
+        rows.append(bytes(rgb))
+    return rows
+
+
+def max_difference(a: List[bytes], b: List[bytes]) -> int:
+    worst = 0
+    for row_a, row_b in zip(a, b):
+        if row_a != row_b:
+            worst = max(worst, max(abs(x - y) for x, y in zip(row_a, row_b)))
+    return worst
+
+
+def optimize_png(data: bytes, tolerance: int = 0, allow_bilevel: bool = True) -> Tuple[bytes, str]:
+    """Smallest lossless (within tolerance) re-encoding and its mode name
+
+    Returns the input unchanged, with mode 'original', when nothing smaller
+    was found. Every candidate is decoded again and compared to the source
+    pixels before it is accepted.
+    """
+    image = decode_png(data)
+    if image.channels != 3:
+        return data, 'original'
+
+    candidates = []
+    gray = to_grayscale(image, tolerance)
+    if gray is not None:
+        bilevel = to_bilevel(gray, tolerance) if allow_bilevel else None
+        if bilevel is not None:
+            candidates.append(('bilevel', encode_png(image.width, image.height, COLOR_GRAY, 1,
+                                                     [pack_bilevel(row) for row in bilevel])))
+        candidates.append(('gray', encode_png(image.width, image.height, COLOR_GRAY, 8, gray)))
+    else:
+        candidates.append(('rgb', encode_png(image.width, image.height, COLOR_RGB, 8, image.rows)))
+
+    for mode, encoded in sorted(candidates, key=lambda item: len(item[1])):
+        if len(encoded) >= len(data):
+            break
+        decoded = decode_png(encoded)
+        if (decoded.width, decoded.height) == (image.width, image.height) and \
+                max_difference(expand_to_rgb(decoded), image.rows) <= tolerance:
+            return encoded, mode
+    return data, 'original'
+
+# ============================================================================
+# BATCH OPTIMIZATION
+# ============================================================================
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def optimize_file(source: str, target: str, tolerance: int, allow_bilevel: bool) -> Dict:
+    """Worker: optimize one file and write it atomically"""
+    start = time.perf_counter()
+    with open(source, 'rb') as f:
+        data = f.read()
+    try:
+        optimized, mode = optimize_png(data, tolerance, allow_bilevel)
+    except (ValueError, zlib.error) as e:
+        optimized, mode = data, f'skipped: {e}'
+
+    target_path = Path(target)
+    # In place, an unchanged file needs no rewrite
+    if optimized is not data or target_path.resolve() != Path(source).resolve():
+        tmp_path = target_path.with_name(f'.{target_path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(optimized)
+        os.replace(tmp_path, target_path)
+    return {
+        'name': Path(source).name,
+        'source_sha256': file_digest(data),
+        'output_sha256': file_digest(optimized),
+        'mode': mode,
+        'source_bytes': len(data),
+        'output_bytes': len(optimized),
+        'seconds': round(time.perf_counter() - start, 2),
+    }
+
+
+class ImageOptimizer:
+    """Optimizes a directory of scans in parallel, skipping finished pages
+
+    The cache maps each file name to the hashes of its source and output,
+    so a rerun skips a page whose source is unchanged and whose output is
+    still in place, including outputs written over their source.
+    """
+
+    def __init__(self, source_dir: str = 'pages', output_dir: Optional[str] = 'pages_optimized',
+                 cache_file: str = '.image_cache.json', tolerance: int = 0, allow_bilevel: bool = True):
+        self.source_dir = Path(source_dir)
+        self.output_dir = Path(output_dir) if output_dir else self.source_dir
+        self.cache_file = Path(cache_file)
+        self.tolerance = tolerance
+        self.allow_bilevel = allow_bilevel
+        self.cache = self.load_cache()
+
+    def load_cache(self) -> Dict:
+        if self.cache_file.exists():
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def save_cache(self):
+        tmp_path = self.cache_file.with_name(self.cache_file.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.cache_file)
+
+    def is_done(self, source: Path) -> bool:
+        entry = self.cache.get(source.name)
+        target = self.output_dir / source.name
+        if not entry or entry.get('tolerance') != self.tolerance or not target.exists():
+            return False
+        with open(source, 'rb') as f:
+            source_hash = file_digest(f.read())
+        with open(target, 'rb') as f:
+            target_hash = file_digest(f.read())
+        # In place, the source already is the recorded output
+        return source_hash in (entry['source_sha256'], entry['output_sha256']) and \
+            target_hash == entry['output_sha256']
+
+    def run(self, workers: int, limit: Optional[int] = None):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        sources = sorted(self.source_dir.glob('page_*.png'))[:limit]
+        todo = [source for source in sources if not self.is_done(source)]
+
+        print(f"\n{'='*75}")
+        print(f"🖼️  PAGE SCAN OPTIMIZER")
+        print(f"{'='*75}")
+        print(f"📊 {len(sources)} scans in {self.source_dir} → {self.output_dir}")
+        print(f"   Cached: {len(sources) - len(todo)}, to process: {len(todo)}, workers: {workers}, "
+              f"tolerance: {self.tolerance}\n")
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(optimize_file, str(source), str(self.output_dir / source.name),
+                            self.tolerance, self.allow_bilevel)
+                for source in todo
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                result['tolerance'] = self.tolerance
+                self.cache[result['name']] = result
+                saved = 1 - result['output_bytes'] / result['source_bytes']
+                print(f"   ✓ [{done}/{len(todo)}] {result['name']}: {result['mode']}, "
+                      f"{result['source_bytes'] // 1024} KB → {result['output_bytes'] // 1024} KB "
+                      f"(-{saved:.0%}) in {result['seconds']}s")
+                if done % 10 == 0:
+                    self.save_cache()
+        self.save_cache()
+
+        entries = [self.cache[source.name] for source in sources if source.name in self.cache]
+        before = sum(entry['source_bytes'] for entry in entries)
+        after = sum(entry['output_bytes'] for entry in entries)
+        modes: Dict[str, int] = {}
+        for entry in entries:
+            modes[entry['mode']] = modes.get(entry['mode'], 0) + 1
+
+        print(f"\n{'='*75}")
+        print(f"✅ DONE in {time.perf_counter() - start:.1f}s")
+        print(f"   📦 {before / 1024 / 1024:.1f} MB → {after / 1024 / 1024:.1f} MB "
+              f"({(1 - after / before) if before else 0:.0%} smaller)")
+        print(f"   🎨 " + ', '.join(f"{mode}: {count}" for mode, count in sorted(modes.items())))
+        print(f"{'='*75}\n")
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Losslessly shrink the page scans')
+    parser.add_argument('--source', default='pages', help='Directory of page_XXXX.png scans')
+    parser.add_argument('--output', default='pages_optimized', help='Output directory')
+    parser.add_argument('--in-place', action='store_true',
+                        help='Replace the source files (only ever with verified, smaller files)')
+    parser.add_argument('--tolerance', type=int, default=0,
+                        help='Max per-channel difference accepted for gray/bilevel conversion (default: 0)')
+    parser.add_argument('--no-bilevel', action='store_true', help='Never convert to 1-bit')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Worker processes')
+    parser.add_argument('--limit', type=int, help='Only process the first N pages')
+    args = parser.parse_args()
+
+    optimizer = ImageOptimizer(args.source, None if args.in_place else args.output,
+                               tolerance=args.tolerance, allow_bilevel=not args.no_bilevel)
+    optimizer.run(max(1, args.workers), args.limit)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Delta-Encoded Translated Pages
+Stores each translated page as node replacements against its English source
+Uses only built-in Python libraries - no external dependencies
+"""
+
+import gzip
+import json
+import os
+import re
+import sys
+from array import array
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+# ============================================================================
+# FORMAT
+# ============================================================================
+#
+# A page is split into nodes: tags at odd indices, the text between them at
+# even indices (possibly empty). js/page-delta.js splits with the same
+# pattern, so both sides agree on node indices. A delta is
+#
+#   {"format": 1, "source": "page_0050.html", "lang": "ro",
+#    "source_hash": "<fnv1a32>", "nodes": <source node count>,
+#    "ops": [[start, end, "replacement"], ...]}
+#
+# where each op replaces source nodes [start, end) with a literal string.
+# Ops are sorted and disjoint, so applying them is one pass over the nodes.
+#
+# A delta only applies to the exact source it was made from. Before full
+# pages are pruned, their sources are saved to delta_sources.json.gz, so
+# editing an English page later cannot lose the translation: the delta is
+# then applied to the saved source instead. The store is keyed by
+# source_hash and shared by every language, so a source pruned for several
+# languages is kept once, and sources no delta refers to are dropped.
+
+DELTA_FORMAT = 1
+TAG_PATTERN = re.compile(r'(<[A-Za-z!/?][^>]*>)')
+DELTA_NAME_PATTERN = re.compile(r'page_(\d+)_([a-z]{2})\.delta\.json$')
+SNAPSHOT_FILENAME = 'delta_sources.json.gz'
+# Earlier per-language stores keyed by source filename; folded in on load
+LEGACY_SNAPSHOT_PATTERN = 'delta_sources_*.json.gz'
+
+
+class StaleDeltaError(ValueError):
+    """The English source no longer matches the one the delta was made from"""
+
+
+def delta_filename(page_num: int, language: str) -> str:
+    return f'page_{page_num:04d}_{language}.delta.json'
+
+
+def tokenize(html: str) -> List[str]:
+    """Alternating text and tag nodes; a bare '<' before a digit stays text"""
+    return TAG_PATTERN.split(html)
+
+
+def fnv1a32(text: str) -> str:
+    """FNV-1a over UTF-16 code units, matching String.charCodeAt in JS"""
+    units = array('H', text.encode('utf-16-le'))
+    if sys.byteorder == 'big':
+        units.byteswap()
+    h = 0x811C9DC5
+    for unit in units:
+        h = ((h ^ unit) * 0x01000193) & 0xFFFFFFFF
+    return f'{h:08x}'
+
+# ============================================================================
+# ENCODE / APPLY
+# ============================================================================
+
+def make_delta(source_html: str, target_html: str, source_name: str, language: str) -> Dict:
+    """Delta turning source_html into target_html"""
+    source, target = tokenize(source_html), tokenize(target_html)
+    matcher = SequenceMatcher(None, source, target, autojunk=False)
+    ops = [
+        [i1, i2, ''.join(target[j1:j2])]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != 'equal'
+    ]
+    return {
+        'format': DELTA_FORMAT,
+        'source': source_name,
+        'lang': language,
+        'source_hash': fnv1a32(source_html),
+        'nodes': len(source),
+        'ops': ops,
+    }
+
+
+def apply_delta(source_html: str, delta: Dict) -> str:
+    """Rebuild the translated page; ValueError if the source has changed"""
+    if delta.get('format') != DELTA_FORMAT:
+        raise ValueError(f"unsupported delta format {delta.get('format')}")
+    if fnv1a32(source_html) != delta['source_hash']:
+        raise StaleDeltaError(f"{delta['source']} changed since the delta was made")
+    nodes = tokenize(source_html)
+
+    out, pos = [], 0
+    for start, end, replacement in delta['ops']:
+        out.extend(nodes[pos:start])
+        out.append(replacement)
+        pos = end
+    out.extend(nodes[pos:])
+    return ''.join(out)
+
+
+def translated_page_exists(text_dir: Path, page_num: int, language: str) -> bool:
+    """True when the page is stored either in full or as a delta"""
+    return ((text_dir / f'page_{page_num:04d}_{language}.html').exists()
+            or (text_dir / delta_filename(page_num, language)).exists())
+
+
+# Parsed snapshot archives keyed by path, reused while their mtime is unchanged
+_snapshots: Dict[Path, tuple] = {}
+
+
+def _read_archive(path: Path) -> Dict[str, str]:
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return {}
+    cached = _snapshots.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        sources = json.load(f)
+    _snapshots[path] = (mtime, sources)
+    return sources
+
+
+def load_snapshots(text_dir: Path) -> Dict[str, str]:
+    """Saved English sources of pruned pages, by source_hash"""
+    sources = _read_archive(text_dir / SNAPSHOT_FILENAME)
+    legacy = sorted(text_dir.glob(LEGACY_SNAPSHOT_PATTERN))
+    if not legacy:
+        return sources
+    merged = dict(sources)
+    for path in legacy:
+        for html in _read_archive(path).values():
+            merged.setdefault(fnv1a32(html), html)
+    return merged
+
+
+def referenced_hashes(text_dir: Path) -> Set[str]:
+    """source_hash of every delta in the directory, in any language"""
+    hashes = set()
+    for delta_path in text_dir.glob('page_*_*.delta.json'):
+        with open(delta_path, 'r', encoding='utf-8') as f:
+            hashes.add(json.load(f)['source_hash'])
+    return hashes
+
+
+def save_snapshots(text_dir: Path, sources: Dict[str, str]) -> Dict[str, int]:
+    """Add missing sources to the shared store and drop unreferenced ones
+
+    The archive is only rewritten (atomically) when something changed;
+    legacy per-language archives are removed once folded in.
+    """
+    stored = load_snapshots(text_dir)
+    keep = referenced_hashes(text_dir)
+    kept = {h: html for h, html in stored.items() if h in keep}
+    added = {h: html for h, html in sources.items() if h not in kept}
+    stats = {'added': len(added), 'removed': len(stored) - len(kept)}
+
+    legacy = list(text_dir.glob(LEGACY_SNAPSHOT_PATTERN))
+    path = text_dir / SNAPSHOT_FILENAME
+    if added or stats['removed'] or legacy:
+        kept.update(added)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(kept, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        for legacy_path in legacy:
+            legacy_path.unlink()
+    return stats
+
+
+def read_translated_page(text_dir: Path, page_num: int, language: str) -> Optional[str]:
+    """A translated page from its full file or, failing that, its delta
+
+    A delta whose English source has been edited is applied to the saved
+    source instead; StaleDeltaError means neither is available.
+    """
+    full_path = text_dir / f'page_{page_num:04d}_{language}.html'
+    if full_path.exists():
+        with open(full_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    delta_path = text_dir / delta_filename(page_num, language)
+    if not delta_path.exists():
+        return None
+    with open(delta_path, 'r', encoding='utf-8') as f:
+        delta = json.load(f)
+
+    source_path = text_dir / delta['source']
+    if source_path.exists():
+        with open(source_path, 'r', encoding='utf-8') as f:
+            source_html = f.read()
+        if fnv1a32(source_html) == delta['source_hash']:
+            return apply_delta(source_html, delta)
+    saved = load_snapshots(text_dir).get(delta['source_hash'])
+    if saved is None:
+        raise StaleDeltaError(f"{delta['source']} changed since {delta_path.name} was made "
+                              f"and no saved copy exists")
+    return apply_delta(saved, delta)
+
+# ============================================================================
+# BATCH CONVERSION
+# ============================================================================
+
+def encode_directory(text_dir: Path, language: str, prune: bool = False) -> Dict[str, int]:
+    """Write a verified delta for every full translated page
+
+    With prune, the full pages are deleted only after their English
+    sources are saved and every delta reproduces its page from the
+    saved copy.
+    """
+    stats = {'pages': 0, 'full_bytes': 0, 'delta_bytes': 0, 'pruned': 0,
+             'sources_added': 0, 'sources_removed': 0}
+    encoded = []
+    for full_path in sorted(text_dir.glob(f'page_*_{language}.html')):
+        source_path = text_dir / full_path.name.replace(f'_{language}.html', '.html')
+        if not source_path.exists():
+            continue
+        with open(source_path, 'r', encoding='utf-8') as f:
+            source_html = f.read()
+        with open(full_path, 'r', encoding='utf-8') as f:
+            target_html = f.read()
+
+        delta = make_delta(source_html, target_html, source_path.name, language)
+        if apply_delta(source_html, delta) != target_html:
+            raise ValueError(f'{full_path.name}: delta does not reproduce the page')
+
+        page_num = int(re.search(r'page_(\d+)', full_path.name).group(1))
+        delta_path = text_dir / delta_filename(page_num, language)
+        body = json.dumps(delta, ensure_ascii=False, separators=(',', ':'))
+        tmp_path = delta_path.with_name(delta_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(body)
+        os.replace(tmp_path, delta_path)
+        encoded.append((full_path, delta, source_html, target_html))
+
+        stats['pages'] += 1
+        stats['full_bytes'] += len(target_html.encode('utf-8'))
+        stats['delta_bytes'] += len(body.encode('utf-8'))
+
+    if prune and encoded:
+        saved = save_snapshots(text_dir, {delta['source_hash']: source for _, delta, source, _ in encoded})
+        stats['sources_added'], stats['sources_removed'] = saved['added'], saved['removed']
+        stored = load_snapshots(text_dir)
+        for full_path, delta, _, target_html in encoded:
+            if apply_delta(stored[delta['source_hash']], delta) != target_html:
+                raise ValueError(f'{full_path.name}: saved source does not reproduce the page, not pruning')
+        for full_path, _, _, _ in encoded:
+            full_path.unlink()
+            stats['pruned'] += 1
+    return stats
+
+
+def decode_directory(text_dir: Path, language: str) -> Dict[str, list]:
+    """Materialize full translated pages from their deltas
+
+    Pages that cannot be rebuilt are reported under 'failed' instead of
+    stopping the run.
+    """
+    result = {'written': [], 'failed': []}
+    for delta_path in sorted(text_dir.glob(f'page_*_{language}.delta.json')):
+        page_num = int(DELTA_NAME_PATTERN.search(delta_path.name).group(1))
+        full_path = text_dir / f'page_{page_num:04d}_{language}.html'
+        if full_path.exists():
+            continue
+        try:
+            html = read_translated_page(text_dir, page_num, language)
+        except (OSError, ValueError, KeyError) as e:
+            result['failed'].append((delta_path.name, str(e)))
+            continue
+        with open(full_path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        result['written'].append(full_path.name)
+    return result
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Convert translated pages to and from deltas')
+    parser.add_argument('command', choices=('encode', 'decode'),
+                        help='encode: write page_XXXX_<lang>.delta.json; decode: rebuild missing full pages')
+    parser.add_argument('--language', default='ro', help='Language suffix (default: ro)')
+    parser.add_argument('--text-dir', default='text', help='Directory of page HTML files')
+    parser.add_argument('--prune', action='store_true',
+                        help='After encoding, save the English sources and delete full pages '
+                             'whose delta was verified against them')
+    args = parser.parse_args()
+
+    text_dir = Path(args.text_dir)
+    start = time.perf_counter()
+    if args.command == 'encode':
+        stats = encode_directory(text_dir, args.language, args.prune)
+        ratio = stats['delta_bytes'] / stats['full_bytes'] if stats['full_bytes'] else 0
+        print(f"🧩 {stats['pages']} pages: {stats['full_bytes'] / 1024:.0f} KB full → "
+              f"{stats['delta_bytes'] / 1024:.0f} KB deltas ({ratio:.0%}) "
+              f"in {time.perf_counter() - start:.1f}s")
+        if stats['pruned']:
+            snapshot = text_dir / SNAPSHOT_FILENAME
+            print(f"🗑️  Pruned {stats['pruned']} full pages; {stats['sources_added']} English sources "
+                  f"added to {snapshot}, {stats['sources_removed']} unreferenced removed "
+                  f"({snapshot.stat().st_size / 1024:.0f} KB)")
+    else:
+        result = decode_directory(text_dir, args.language)
+        print(f"📄 Rebuilt {len(result['written'])} pages in {time.perf_counter() - start:.1f}s")
+        for name, error in result['failed']:
+            print(f"⚠️  {name}: {error}")
+        if result['failed']:
+            sys.exit(1)
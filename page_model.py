@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared Page Data Model
+Parses text/*.html once into compact Page objects backed by a columnar cache
+Uses only built-in Python libraries - no external dependencies
+"""
+
+import gzip
+import json
+import os
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from page_delta import DELTA_NAME_PATTERN, StaleDeltaError, read_translated_page
+
+# ============================================================================
+# DATA MODEL
+# ============================================================================
+
+# Commentary sections every page carries, in document order
+SECTION_TITLES = (
+    'Summary',
+    'Key Concepts',
+    'Historical & Geographic Context',
+    'Connection to Main Thesis',
+)
+
+PAGE_NAME_PATTERN = re.compile(r'page_(\d+)(?:_([a-z]{2}))?\.html$')
+
+CACHE_VERSION = 1
+
+
+def page_number_from_name(name: str) -> Optional[int]:
+    """Page number encoded in a page_XXXX[_lang].html filename"""
+    match = PAGE_NAME_PATTERN.search(name)
+    return int(match.group(1)) if match else None
+
+
+def page_language_from_name(name: str) -> Optional[str]:
+    """Language suffix of a page filename ('en' when there is none)"""
+    match = PAGE_NAME_PATTERN.search(name)
+    if not match:
+        return None
+    return match.group(2) or 'en'
+
+
+def page_filename(page_num: int, language: str = 'en') -> str:
+    """Filename of a page in the given language"""
+    suffix = '' if language == 'en' else f'_{language}'
+    return f'page_{page_num:04d}{suffix}.html'
+
+
+class CommentarySection:
+    """One titled block of the educational analysis"""
+
+    __slots__ = ('title', 'text')
+
+    def __init__(self, title: str, text: str):
+        self.title = title
+        self.text = text
+
+    def __repr__(self):
+        return f'CommentarySection({self.title!r}, {len(self.text)} chars)'
+
+
+class Page:
+    """Original paragraphs and commentary of one book page"""
+
+    __slots__ = ('number', 'paragraphs', 'commentary')
+
+    def __init__(self, number: int, paragraphs: Tuple[str, ...], commentary: Tuple[CommentarySection, ...]):
+        self.number = number
+        self.paragraphs = paragraphs
+        self.commentary = commentary
+
+    @property
+    def original_text(self) -> str:
+        return '\n'.join(self.paragraphs)
+
+    @property
+    def commentary_text(self) -> str:
+        return '\n'.join(section.text for section in self.commentary)
+
+    def section(self, title: str) -> Optional[CommentarySection]:
+        """Commentary section by title, or None"""
+        for section in self.commentary:
+            if section.title == title:
+                return section
+        return None
+
+    def __repr__(self):
+        return f'Page({self.number}, {len(self.paragraphs)} paragraphs, {len(self.commentary)} sections)'
+
+# ============================================================================
+# HTML PARSING
+# ============================================================================
+
+class _PageHTMLParser(HTMLParser):
+    """Collects text-content paragraphs and commentary sections"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs: List[str] = []
+        self.sections: List[Tuple[str, List[str]]] = []
+        self._region = None      # 'original' or 'commentary'
+        self._div_depth = 0      # depth of nested divs inside the current region
+        self._capture = None     # 'p' or 'h3' while collecting text
+        self._buffer: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'div':
+            classes = (dict(attrs).get('class') or '').split()
+            if self._region:
+                self._div_depth += 1
+            elif 'text-content' in classes:
+                self._region, self._div_depth = 'original', 1
+            elif 'commentary-sections' in classes:
+                self._region, self._div_depth = 'commentary', 1
+        elif self._region and tag in ('p', 'h3'):
+            self._capture = tag
+            self._buffer = []
+
+    def handle_endtag(self, tag):
+        if tag == 'div' and self._region:
+            self._div_depth -= 1
+            if self._div_depth == 0:
+                self._region = None
+        elif tag == self._capture:
+            text = ''.join(self._buffer).strip()
+            if self._capture == 'h3':
+                self.sections.append((text, []))
+            elif self._region == 'original':
+                if text:
+                    self.paragraphs.append(text)
+            elif self.sections:
+                self.sections[-1][1].append(text)
+            self._capture = None
+
+    def handle_data(self, data):
+        if self._capture:
+            self._buffer.append(data)
+
+
+def parse_page_html(html: str, page_num: int) -> Page:
+    """Parse one page's HTML into a Page"""
+    parser = _PageHTMLParser()
+    parser.feed(html)
+    parser.close()
+    commentary = tuple(
+        CommentarySection(title, '\n'.join(texts))
+        for title, texts in parser.sections
+    )
+    return Page(page_num, tuple(parser.paragraphs), commentary)
+
+# ============================================================================
+# COLUMNAR CACHE
+# ============================================================================
+
+class PageStore:
+    """Loads pages from a columnar cache, re-parsing only changed HTML files"""
+
+    def __init__(self, text_dir: str = 'text', cache_dir: str = '.'):
+        self.text_dir = Path(text_dir)
+        self.cache_dir = Path(cache_dir)
+
+    def cache_path(self, language: str) -> Path:
+        return self.cache_dir / f'.page_cache_{language}.json.gz'
+
+    def source_files(self, language: str) -> List[Path]:
+        """Page files for one language, ordered by page number
+
+        Translated pages stored only as a delta against their English
+        source (see page_delta.py) are represented by the delta file.
+        """
+        files = {
+            page_number_from_name(path.name): path
+            for path in self.text_dir.glob('page_*.html')
+            if page_language_from_name(path.name) == language
+        }
+        if language != 'en':
+            for path in self.text_dir.glob(f'page_*_{language}.delta.json'):
+                files.setdefault(int(DELTA_NAME_PATTERN.search(path.name).group(1)), path)
+        return [files[number] for number in sorted(files)]
+
+    def load(self, language: str = 'en') -> List[Page]:
+        """All pages for a language, parsing HTML only when the cache is stale"""
+        files = self.source_files(language)
+        cached = self._read_cache(language)
+        pages = []
+        dirty = False
+
+        for path in files:
+            delta = DELTA_NAME_PATTERN.search(path.name)
+            stat = path.stat()
+            signature = [stat.st_mtime_ns, stat.st_size]
+            if delta:
+                # A delta is only as fresh as the English page it applies to
+                source = self.text_dir / page_filename(int(delta.group(1)))
+                if source.exists():
+                    source_stat = source.stat()
+                    signature += [source_stat.st_mtime_ns, source_stat.st_size]
+            entry = cached.get(path.name)
+            if entry and entry[0] == signature:
+                pages.append(entry[1])
+                continue
+            if delta:
+                number = int(delta.group(1))
+                try:
+                    html = read_translated_page(self.text_dir, number, language)
+                except StaleDeltaError as e:
+                    # Leave the page out, like an untranslated one
+                    print(f"⚠️  Skipping {path.name}: {e}")
+                    continue
+            else:
+                number = page_number_from_name(path.name)
+                with open(path, 'r', encoding='utf-8') as f:
+                    html = f.read()
+            page = parse_page_html(html, number)
+            cached[path.name] = (signature, page)
+            pages.append(page)
+            dirty = True
+
+        if dirty or len(cached) != len(files):
+            self._write_cache(language, {path.name: cached[path.name] for path in files
+                                         if path.name in cached})
+        return pages
+
+    def read_page(self, page_num: int, language: str = 'en') -> Optional[Page]:
+        """One page parsed from its file or delta, without the whole-book cache
+
+        For streaming consumers that must hold only a few pages at a time.
+        """
+        if language == 'en':
+            path = self.text_dir / page_filename(page_num)
+            if not path.exists():
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                html = f.read()
+        else:
+            try:
+                html = read_translated_page(self.text_dir, page_num, language)
+            except StaleDeltaError as e:
+                print(f"⚠️  Skipping page {page_num} ({language}): {e}")
+                return None
+            if html is None:
+                return None
+        return parse_page_html(html, page_num)
+
+    def load_map(self, language: str = 'en') -> Dict[int, Page]:
+        """Pages keyed by page number"""
+        return {page.number: page for page in self.load(language)}
+
+    def _read_cache(self, language: str) -> Dict[str, Tuple[list, Page]]:
+        path = self.cache_path(language)
+        if not path.exists():
+            return {}
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != CACHE_VERSION or list(data.get('titles', [])) != list(SECTION_TITLES):
+            return {}
+
+        # Columns: one row per page; paragraphs and section texts are flattened
+        # with per-page offsets so the file stays a handful of flat arrays
+        entries = {}
+        paragraphs = data['paragraphs']
+        offsets = data['paragraph_offsets']
+        section_titles = data['section_titles']
+        section_texts = data['section_texts']
+        section_offsets = data['section_offsets']
+        for row, name in enumerate(data['files']):
+            section_range = range(section_offsets[row], section_offsets[row + 1])
+            page = Page(
+                data['numbers'][row],
+                tuple(paragraphs[offsets[row]:offsets[row + 1]]),
+                tuple(CommentarySection(section_titles[i], section_texts[i]) for i in section_range),
+            )
+            entries[name] = (data['signatures'][row], page)
+        return entries
+
+    def _write_cache(self, language: str, entries: Dict[str, Tuple[list, Page]]):
+        columns = {
+            'version': CACHE_VERSION,
+            'titles': list(SECTION_TITLES),
+            'files': [],
+            'signatures': [],
+            'numbers': [],
+            'paragraphs': [],
+            'paragraph_offsets': [0],
+            'section_titles': [],
+            'section_texts': [],
+            'section_offsets': [0],
+        }
+        for name, (signature, page) in entries.items():
+            columns['files'].append(name)
+            columns['signatures'].append(signature)
+            columns['numbers'].append(page.number)
+            columns['paragraphs'].extend(page.paragraphs)
+            columns['paragraph_offsets'].append(len(columns['paragraphs']))
+            for section in page.commentary:
+                columns['section_titles'].append(section.title)
+                columns['section_texts'].append(section.text)
+            columns['section_offsets'].append(len(columns['section_texts']))
+
+        path = self.cache_path(language)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(columns, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+
+def load_pages(language: str = 'en', text_dir: str = 'text', cache_dir: str = '.') -> List[Page]:
+    """Convenience wrapper around PageStore.load"""
+    return PageStore(text_dir, cache_dir).load(language)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+if __name__ == '__main__':
+    import time
+
+    store = PageStore('text')
+    for language in ('en', 'ro'):
+        start = time.perf_counter()
+        pages = store.load(language)
+        elapsed = (time.perf_counter() - start) * 1000
+        paragraphs = sum(len(page.paragraphs) for page in pages)
+        print(f"📄 {language}: {len(pages)} pages, {paragraphs} paragraphs in {elapsed:.0f} ms "
+              f"→ {store.cache_path(language)}")
@@ -15,4 +15,4 @@ echo ""
 echo "Press Ctrl+C to stop the server"
 echo ""
 
-python3 -m http.server 8000
+python3 server.py --port 8000
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local Study Guide Server
+Static file server for the reader plus small JSON API endpoints
+Uses only built-in Python libraries - no external dependencies
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from page_delta import read_translated_page
+from page_model import page_filename
+from telemetry import TelemetryAggregator, format_report
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+MAX_BODY_BYTES = 64 * 1024
+TELEMETRY_SNAPSHOT = '.telemetry.json'
+SNAPSHOT_INTERVAL = 60.0
+
+TRANSLATED_PAGE_PATTERN = re.compile(r'^/text/page_(\d{4})_([a-z]{2})\.html$')
+# Languages the glossary translator can produce
+ON_DEMAND_LANGUAGES = {'ro'}
+TRANSLATION_CACHE_MB = 32
+
+# ============================================================================
+# ON-DEMAND TRANSLATION
+# ============================================================================
+
+
+class LRUCache:
+    """Thread-safe LRU of byte strings bounded by their total size"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key) -> Optional[bytes]:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class PageTranslationService:
+    """Translates EN pages at request time through the v2 page translator
+
+    Results are cached under the glossary version, so editing the glossary
+    in translate_all_pages_v2.py is picked up on the next request without a
+    rebuild or restart. Concurrent requests for the same uncached page
+    share one translation (single flight).
+    """
+
+    def __init__(self, text_dir: Path, max_bytes: int = TRANSLATION_CACHE_MB * 1024 * 1024):
+        self.text_dir = text_dir
+        self.cache = LRUCache(max_bytes)
+        self.inflight: Dict[Tuple, Future] = {}
+        self.lock = threading.Lock()
+        self.module = None
+        self.module_mtime = None
+        self.translator = None
+        self.version = None
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'reloads': 0, 'errors': 0}
+
+    def current_translator(self):
+        """(glossary version, HTMLTranslator), reloading an edited glossary"""
+        with self.lock:
+            if self.module is None:
+                self.module = importlib.import_module('translate_all_pages_v2')
+            mtime = Path(self.module.__file__).stat().st_mtime_ns
+            if mtime != self.module_mtime:
+                if self.module_mtime is not None:
+                    self.module = importlib.reload(self.module)
+                    self.stats['reloads'] += 1
+                self.module_mtime = mtime
+                glossary = self.module.TRANSLATION_GLOSSARY
+                self.version = self.module.glossary_version(glossary)
+                self.translator = self.module.HTMLTranslator(glossary)
+            return self.version, self.translator
+
+    def source_mtime(self, page_num: int) -> Optional[int]:
+        try:
+            return (self.text_dir / page_filename(page_num)).stat().st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def etag(version: str, language: str, page_num: int, source_mtime: int) -> str:
+        # Same inputs as the cache key, so an edited source changes the tag
+        return f'"{version}-{language}-{page_num}-{source_mtime:x}"'
+
+    def current_etag(self, page_num: int, language: str) -> Optional[str]:
+        """ETag the page would be served with now, without translating it"""
+        source_mtime = self.source_mtime(page_num)
+        if source_mtime is None:
+            return None
+        version, _ = self.current_translator()
+        return self.etag(version, language, page_num, source_mtime)
+
+    def get(self, page_num: int, language: str) -> Optional[Tuple[bytes, str, str, bool]]:
+        """(html, glossary version, etag, cache hit) or None if there is no source
+
+        A failed translation raises in the leader and in every request
+        coalesced onto it; nothing is cached, so the next request retries.
+        """
+        source = self.text_dir / page_filename(page_num)
+        source_mtime = self.source_mtime(page_num)
+        if source_mtime is None:
+            return None
+
+        version, translator = self.current_translator()
+        key = (version, language, page_num, source_mtime)
+        etag = self.etag(*key)
+        cached = self.cache.get(key)
+        if cached is not None:
+            with self.lock:
+                self.stats['hits'] += 1
+            return cached, version, etag, True
+
+        with self.lock:
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self.inflight[key] = Future()
+                self.stats['misses'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            html = future.result()
+            return (html, version, etag, False) if html is not None else None
+
+        try:
+            html = self.translate(source, page_num, translator)
+            if html is not None:
+                self.cache.put(key, html)
+            future.set_result(html)
+        except BaseException as e:
+            with self.lock:
+                self.stats['errors'] += 1
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[key]
+        return (html, version, etag, False) if html is not None else None
+
+    def translate(self, source: Path, page_num: int, translator) -> Optional[bytes]:
+        with open(source, 'r', encoding='utf-8') as f:
+            english_html = f.read()
+        translated = translator.translate_page(english_html, page_num)
+        if translated is None:
+            return None
+        return translated.replace('<html lang="en">', '<html lang="ro">', 1).encode('utf-8')
+
+    def summary(self) -> Dict:
+        with self.cache.lock:
+            entries, size = len(self.cache.entries), self.cache.size
+        return {
+            'glossary_version': self.version,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.cache.max_bytes,
+            **self.stats,
+        }
+
+# ============================================================================
+# REQUEST HANDLER
+# ============================================================================
+
+
+class StudyGuideHandler(SimpleHTTPRequestHandler):
+    """Serves the site from the repo root and answers /api/* requests"""
+
+    # Set on the class by make_server()
+    telemetry: TelemetryAggregator = None
+    translations: Optional[PageTranslationService] = None
+    translate_mode = 'missing'
+    quiet = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/api/telemetry/summary':
+            self.telemetry_summary(parse_qs(url.query))
+        elif url.path == '/api/translate/stats' and self.translations:
+            self.send_json(self.translations.summary())
+        elif url.path.startswith('/api/'):
+            self.send_json({'error': 'not found'}, HTTPStatus.NOT_FOUND)
+        elif not self.serve_on_demand(url.path):
+            super().do_GET()
+
+    def do_HEAD(self):
+        # Same routing as GET, so HEAD agrees with it for delta and on-demand pages
+        if not self.serve_on_demand(urlsplit(self.path).path):
+            super().do_HEAD()
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path == '/api/telemetry':
+            self.telemetry_ingest()
+        else:
+            self.send_json({'error': 'not found'}, HTTPStatus.NOT_FOUND)
+
+    # ------------------------------------------------------------------
+    # Telemetry
+    # ------------------------------------------------------------------
+
+    def telemetry_ingest(self):
+        payload = self.read_json_body()
+        if payload is None:
+            return
+        try:
+            self.telemetry.ingest(payload)
+        except ValueError as e:
+            self.send_json({'error': str(e)}, HTTPStatus.BAD_REQUEST)
+            return
+        # Beacons ignore the response body
+        self.send_response(HTTPStatus.NO_CONTENT)
+        self.end_headers()
+
+    def telemetry_summary(self, query):
+        if 'page' in query:
+            try:
+                page = int(query['page'][0])
+            except ValueError:
+                self.send_json({'error': 'page must be an integer'}, HTTPStatus.BAD_REQUEST)
+                return
+            self.send_json({'page': page, 'metrics': self.telemetry.page_summary(page)})
+            return
+
+        try:
+            slowest = int(query.get('slowest', ['10'])[0])
+        except ValueError:
+            slowest = 10
+        summary = self.telemetry.summary(slowest=slowest)
+        if query.get('format', [''])[0] == 'text':
+            self.send_text(format_report(summary))
+        else:
+            self.send_json(summary)
+
+    # ------------------------------------------------------------------
+    # Translated pages (delta or on-demand)
+    # ------------------------------------------------------------------
+
+    def serve_on_demand(self, path: str) -> bool:
+        """Answer a translated page request; False to fall back to static files
+
+        A missing full page is rebuilt from its delta against the English
+        source before falling back to on-demand translation, which
+        --translate always uses unconditionally.
+        """
+        match = TRANSLATED_PAGE_PATTERN.match(path)
+        if not match:
+            return False
+        page_num, language = int(match.group(1)), match.group(2)
+        on_demand = self.translations is not None and language in ON_DEMAND_LANGUAGES
+        if not (on_demand and self.translate_mode == 'always'):
+            if (Path(self.directory) / path.lstrip('/')).exists():
+                return False
+            if self.serve_delta(page_num, language):
+                return True
+        if not on_demand:
+            return False
+
+        # Revalidation must not cost a translation when nothing changed
+        etag = self.translations.current_etag(page_num, language)
+        if etag is None:
+            return False
+        if self.not_modified(etag):
+            return True
+
+        try:
+            result = self.translations.get(page_num, language)
+        except Exception as e:
+            # Raised in the leader and in every request coalesced onto it
+            self.log_error('translating page %d (%s) failed: %r', page_num, language, e)
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, 'Translation failed')
+            return True
+        if result is None:
+            return False
+        html, version, etag, hit = result
+        self.send_page(html, etag, f'on-demand; glossary={version}; cache={"hit" if hit else "miss"}')
+        return True
+
+    def serve_delta(self, page_num: int, language: str) -> bool:
+        try:
+            html = read_translated_page(Path(self.directory) / 'text', page_num, language)
+        except (OSError, ValueError, KeyError) as e:
+            # A stale delta must not be served as if it were current
+            self.log_message('delta for page %d (%s) unusable: %s', page_num, language, e)
+            return False
+        if html is None:
+            return False
+        body = html.encode('utf-8')
+        self.send_page(body, f'"delta-{hashlib.sha1(body).hexdigest()[:12]}"', 'delta')
+        return True
+
+    def not_modified(self, etag: str) -> bool:
+        """Answer 304 when the client already holds this version"""
+        if self.headers.get('If-None-Match') != etag:
+            return False
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header('ETag', etag)
+        self.end_headers()
+        return True
+
+    def send_page(self, html: bytes, etag: str, translation: str):
+        if self.not_modified(etag):
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(html)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Translation', translation)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(html)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def read_json_body(self):
+        """Parse a bounded JSON body, answering 4xx and returning None on error"""
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_BODY_BYTES:
+            self.send_json({'error': 'body too large or missing length'}, HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+            return None
+        try:
+            # sendBeacon posts text/plain, so the content type is not checked
+            return json.loads(self.rfile.read(length).decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            self.send_json({'error': 'invalid JSON'}, HTTPStatus.BAD_REQUEST)
+            return None
+
+    def send_json(self, data, status=HTTPStatus.OK):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_text(self, text, status=HTTPStatus.OK):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+
+def make_server(host: str, port: int, root: Path, telemetry: TelemetryAggregator,
+                translations: Optional[PageTranslationService] = None, translate_mode: str = 'missing',
+                quiet: bool = False) -> ThreadingHTTPServer:
+    handler = type('Handler', (StudyGuideHandler,), {
+        'telemetry': telemetry,
+        'translations': translations,
+        'translate_mode': translate_mode,
+        'quiet': quiet,
+    })
+    return ThreadingHTTPServer((host, port), partial(handler, directory=str(root)))
+
+
+def snapshot_periodically(telemetry: TelemetryAggregator, path: Path, stop: threading.Event):
+    """Persist telemetry every SNAPSHOT_INTERVAL seconds when it changed"""
+    last_saved = telemetry.accepted
+    while not stop.wait(SNAPSHOT_INTERVAL):
+        if telemetry.accepted != last_saved:
+            last_saved = telemetry.accepted
+            telemetry.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the study guide with telemetry collection')
+    parser.add_argument('--host', default='',
+                        help='Interface to bind (default: all interfaces, like http.server)')
+    parser.add_argument('--port', type=int, default=8000, help='Port (default: 8000)')
+    parser.add_argument('--snapshot', default=TELEMETRY_SNAPSHOT,
+                        help=f'Telemetry snapshot file (default: {TELEMETRY_SNAPSHOT})')
+    parser.add_argument('--translate', choices=('off', 'missing', 'always'), default='missing',
+                        help='On-demand translation of page_XXXX_ro.html: only when no prebuilt file '
+                             'exists (default), always (ignore prebuilt files), or off')
+    parser.add_argument('--translation-cache-mb', type=int, default=TRANSLATION_CACHE_MB,
+                        help=f'Size bound of the translated page cache (default: {TRANSLATION_CACHE_MB})')
+    parser.add_argument('--quiet', action='store_true', help='Do not log every request')
+    args = parser.parse_args()
+
+    root = Path(__file__).resolve().parent
+    snapshot = root / args.snapshot
+    telemetry = TelemetryAggregator.load(snapshot)
+    translations = None
+    if args.translate != 'off':
+        translations = PageTranslationService(root / 'text', args.translation_cache_mb * 1024 * 1024)
+    server = make_server(args.host, args.port, root, telemetry, translations, args.translate, args.quiet)
+
+    stop = threading.Event()
+    saver = threading.Thread(target=snapshot_periodically, args=(telemetry, snapshot, stop), daemon=True)
+    saver.start()
+
+    display_host = args.host or 'localhost'
+    print(f"📖 Serving {root} at http://{display_host}:{args.port}")
+    print(f"📈 Telemetry report: http://{display_host}:{args.port}/api/telemetry/summary?format=text")
+    if translations:
+        print(f"🌐 On-demand translation: {args.translate} "
+              f"(cache {args.translation_cache_mb} MB, stats at /api/translate/stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️  Stopping server")
+    finally:
+        stop.set()
+        server.server_close()
+        if telemetry.accepted:
+            telemetry.save(snapshot)
+            print(f"💾 Telemetry saved to {snapshot}")
+
+
+if __name__ == '__main__':
+    main()
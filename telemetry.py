@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reader Performance Telemetry
+Streaming percentile aggregation of timings beaconed by the reader
+Uses only built-in Python libraries - no external dependencies
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# ============================================================================
+# STREAMING PERCENTILES
+# ============================================================================
+
+# Bucket width: any reported percentile is within 1% of the true value
+RELATIVE_ACCURACY = 0.01
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class StreamingHistogram:
+    """Log-bucketed histogram giving percentiles with bounded relative error
+
+    Memory grows with the logarithm of the value range, not the number of
+    samples: about 700 buckets cover 1 µs to 1000 s.
+    """
+
+    __slots__ = ('counts', 'zeros', 'count', 'total', 'minimum', 'maximum')
+
+    _gamma = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    _log_gamma = math.log(_gamma)
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value: float):
+        if value <= 1e-6:
+            self.zeros += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    def quantile(self, q: float) -> float:
+        """Nearest-rank quantile, clamped to the observed min/max"""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        if rank <= self.zeros:
+            return max(self.minimum, 0.0)
+        seen = self.zeros
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                # Midpoint of the bucket (gamma^(k-1), gamma^k]
+                value = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(value, self.minimum), self.maximum)
+        return self.maximum
+
+    def summary(self) -> Dict:
+        summary = {
+            'count': self.count,
+            'mean': round(self.total / self.count, 2) if self.count else 0.0,
+            'max': round(self.maximum, 2) if self.count else 0.0,
+        }
+        for q in QUANTILES:
+            summary[f'p{round(q * 100)}'] = round(self.quantile(q), 2)
+        return summary
+
+    def to_dict(self) -> Dict:
+        return {
+            'counts': self.counts,
+            'zeros': self.zeros,
+            'count': self.count,
+            'total': self.total,
+            'min': self.minimum if self.count else None,
+            'max': self.maximum if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'StreamingHistogram':
+        histogram = cls()
+        histogram.counts = {int(key): n for key, n in data['counts'].items()}
+        histogram.zeros = data['zeros']
+        histogram.count = data['count']
+        histogram.total = data['total']
+        if histogram.count:
+            histogram.minimum = data['min']
+            histogram.maximum = data['max']
+        return histogram
+
+# ============================================================================
+# AGGREGATOR
+# ============================================================================
+
+# Metrics the reader reports (milliseconds)
+KNOWN_METRICS = {
+    'fetch', 'parse', 'render', 'decode', 'total',
+    'resource', 'navigation', 'dom-content-loaded', 'load',
+}
+KNOWN_TRIGGERS = {'navigate', 'language', 'view', 'zoom', 'mode', 'scroll', 'initial'}
+KNOWN_RESOURCES = {'text', 'image', 'script', 'style', 'data', 'other'}
+
+MAX_EVENTS_PER_BATCH = 500
+MAX_SAMPLE_MS = 600_000
+TOTAL_PAGES = 457
+
+
+class TelemetryAggregator:
+    """Thread-safe per-series percentile tracking for reader timings
+
+    Every accepted event updates three series: the metric overall, the
+    metric per trigger or resource type, and the metric per page.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series: Dict[str, StreamingHistogram] = {}
+        self.started = time.time()
+        self.accepted = 0
+        self.rejected = 0
+        self.batches = 0
+
+    def record(self, key: str, value: float):
+        histogram = self.series.get(key)
+        if histogram is None:
+            histogram = self.series[key] = StreamingHistogram()
+        histogram.add(value)
+
+    def ingest(self, payload: Dict) -> int:
+        """Record a batch {"events": [...]}; returns the number accepted
+
+        Malformed events are counted and skipped rather than failing the
+        batch, since beacons cannot be retried by the client anyway.
+        """
+        events = payload.get('events') if isinstance(payload, dict) else None
+        if not isinstance(events, list):
+            raise ValueError('payload must be an object with an "events" list')
+
+        accepted = 0
+        with self.lock:
+            self.batches += 1
+            for event in events[:MAX_EVENTS_PER_BATCH]:
+                keys = self._series_keys(event)
+                if keys is None:
+                    self.rejected += 1
+                    continue
+                value = float(event['ms'])
+                for key in keys:
+                    self.record(key, value)
+                accepted += 1
+            self.rejected += max(0, len(events) - MAX_EVENTS_PER_BATCH)
+            self.accepted += accepted
+        return accepted
+
+    def _series_keys(self, event) -> Optional[List[str]]:
+        if not isinstance(event, dict):
+            return None
+        metric = event.get('metric')
+        ms = event.get('ms')
+        if metric not in KNOWN_METRICS or isinstance(ms, bool) or not isinstance(ms, (int, float)):
+            return None
+        if not 0 <= ms <= MAX_SAMPLE_MS:
+            return None
+
+        keys = [f'metric:{metric}']
+        if metric == 'resource':
+            resource = event.get('resource')
+            keys.append(f'resource:{resource if resource in KNOWN_RESOURCES else "other"}')
+        elif event.get('trigger') in KNOWN_TRIGGERS:
+            keys.append(f'trigger:{event["trigger"]}:{metric}')
+
+        page = event.get('page')
+        if isinstance(page, int) and not isinstance(page, bool) and 1 <= page <= TOTAL_PAGES:
+            keys.append(f'page:{page}:{metric}')
+        return keys
+
+    def summary(self, slowest: int = 10, metric: str = 'total') -> Dict:
+        """Percentiles for every series plus the slowest pages by p90"""
+        with self.lock:
+            overall, triggers, resources, pages = {}, {}, {}, {}
+            for key, histogram in self.series.items():
+                kind, _, rest = key.partition(':')
+                if kind == 'metric':
+                    overall[rest] = histogram.summary()
+                elif kind == 'trigger':
+                    triggers[rest] = histogram.summary()
+                elif kind == 'resource':
+                    resources[rest] = histogram.summary()
+                elif kind == 'page':
+                    page, _, page_metric = rest.partition(':')
+                    if page_metric == metric:
+                        pages[int(page)] = histogram.summary()
+
+            ranked = sorted(pages.items(), key=lambda item: item[1]['p90'], reverse=True)
+            return {
+                'since': self.started,
+                'batches': self.batches,
+                'events': self.accepted,
+                'rejected': self.rejected,
+                'metrics': dict(sorted(overall.items())),
+                'triggers': dict(sorted(triggers.items())),
+                'resources': dict(sorted(resources.items())),
+                'slowest_pages': [
+                    {'page': page, **stats} for page, stats in ranked[:slowest]
+                ],
+            }
+
+    def page_summary(self, page: int) -> Dict:
+        prefix = f'page:{page}:'
+        with self.lock:
+            return {
+                key[len(prefix):]: histogram.summary()
+                for key, histogram in sorted(self.series.items())
+                if key.startswith(prefix)
+            }
+
+    # ------------------------------------------------------------------
+    # Persistence, so history survives server restarts
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path):
+        with self.lock:
+            data = {
+                'version': 1,
+                'since': self.started,
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'batches': self.batches,
+                'series': {key: h.to_dict() for key, h in self.series.items()},
+            }
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'TelemetryAggregator':
+        aggregator = cls()
+        if not path.exists():
+            return aggregator
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != 1:
+                return aggregator
+            aggregator.started = data['since']
+            aggregator.accepted = data['accepted']
+            aggregator.rejected = data['rejected']
+            aggregator.batches = data['batches']
+            aggregator.series = {
+                key: StreamingHistogram.from_dict(h) for key, h in data['series'].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            print(f"⚠️  Ignoring unreadable telemetry snapshot {path}")
+            return cls()
+        return aggregator
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+def format_report(summary: Dict) -> str:
+    """Human-readable version of TelemetryAggregator.summary()"""
+    def row(name, stats):
+        return (f"   {name:<28} {stats['count']:>7} {stats['p50']:>9.1f} "
+                f"{stats['p90']:>9.1f} {stats['p99']:>9.1f} {stats['max']:>9.1f}")
+
+    header = f"   {'series':<28} {'count':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    lines = [
+        "=" * 80,
+        "📈 READER TELEMETRY",
+        "=" * 80,
+        f"   Since {time.strftime('%Y-%m-%d %H:%M', time.localtime(summary['since']))}: "
+        f"{summary['events']} events in {summary['batches']} batches "
+        f"({summary['rejected']} rejected)",
+    ]
+    for title, section in (('Metrics', 'metrics'), ('By trigger', 'triggers'), ('Resources', 'resources')):
+        if summary[section]:
+            lines += ['', f"⏱️  {title}", header]
+            lines += [row(name, stats) for name, stats in summary[section].items()]
+    if summary['slowest_pages']:
+        lines += ['', "🐢 Slowest pages (total load, by p90)", header]
+        lines += [row(f"page {entry['page']}", entry) for entry in summary['slowest_pages']]
+    return '\n'.join(lines)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Print a report from a saved telemetry snapshot')
+    parser.add_argument('snapshot', nargs='?', default='.telemetry.json',
+                        help='Snapshot written by server.py (default: .telemetry.json)')
+    parser.add_argument('--slowest', type=int, default=10, help='Number of slowest pages to list')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args()
+
+    aggregator = TelemetryAggregator.load(Path(args.snapshot))
+    summary = aggregator.summary(slowest=args.slowest)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(format_report(summary))
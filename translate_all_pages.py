@@ -12,6 +12,8 @@ from pathlib import Path
 from typing import Dict, List
 import html
 
+from page_model import page_language_from_name, page_number_from_name
+
 # ============================================================================
 # TRANSLATION GLOSSARY & TERMINOLOGY
 # ============================================================================
@@ -270,7 +272,7 @@ class BatchProcessor:
         """Get all English HTML pages (non-_ro versions)"""
         pages = []
         for html_file in sorted(self.text_dir.glob('page_*.html')):
-            if '_ro' not in html_file.name:
+            if page_language_from_name(html_file.name) == 'en':
                 pages.append(html_file)
         return pages
 
@@ -312,12 +314,10 @@ class BatchProcessor:
             batch_count = 0
             for page_file in batch_pages:
                 try:
-                    match = re.search(r'page_(\d+)', page_file.name)
-                    if not match:
+                    page_num = page_number_from_name(page_file.name)
+                    if page_num is None:
                         continue
 
-                    page_num = int(match.group(1))
-
                     if page_file.name in progress['translated']:
                         print(f"   ✓ p{page_num:03d} (cached)")
                         batch_count += 1
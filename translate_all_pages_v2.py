@@ -5,12 +5,21 @@ Improved Romanian Translation Script v2
 Smart translation with word boundary detection and context awareness
 """
 
+import hashlib
 import os
 import re
 import json
+import socket
+import time
+import uuid
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import unicodedata
+from html import escape, unescape
+
+from page_delta import translated_page_exists
+from page_model import page_language_from_name, page_number_from_name
+from translation_memory import TranslationMemory
 
 # ============================================================================
 # COMPREHENSIVE TRANSLATION GLOSSARY
@@ -194,6 +203,12 @@ TRANSLATION_GLOSSARY = {
     "about": "despre",
 }
 
+
+def glossary_version(glossary: Dict[str, str]) -> str:
+    """Short content hash identifying a glossary revision"""
+    digest = hashlib.sha1(json.dumps(glossary, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()[:12]
+
 # ============================================================================
 # IMPROVED TRANSLATION SYSTEM
 # ============================================================================
@@ -255,8 +270,19 @@ class SmartTranslator:
 class HTMLTranslator:
     """Handles HTML page translation"""
 
-    def __init__(self, glossary: Dict[str, str]):
+    def __init__(self, glossary: Dict[str, str], memory: Optional[TranslationMemory] = None):
         self.translator = SmartTranslator(glossary)
+        self.memory = memory
+
+    def translate_segment(self, text: str) -> str:
+        """Translate one paragraph's HTML text, through the memory if enabled"""
+        if self.memory is None:
+            return self.translator.translate_text(text)
+        # The memory stores plain text, as seeded from parsed pages; only
+        # re-escape when the source actually used character references
+        plain = unescape(text)
+        translated = self.memory.translate(plain, self.translator.translate_text)
+        return translated if plain == text else escape(translated, quote=False)
 
     def extract_text_from_html(self, html: str) -> Tuple[Dict, Dict]:
         """Extract all translatable text from HTML"""
@@ -316,7 +342,7 @@ class HTMLTranslator:
                 text = match.group(2)
                 closing = match.group(3)
 
-                translated = self.translator.translate_text(text)
+                translated = self.translate_segment(text)
                 return opening + translated + closing
 
             # Find paragraphs with text
@@ -339,17 +365,22 @@ class HTMLTranslator:
 class BatchProcessor:
     """Processes pages in batches"""
 
-    def __init__(self, text_dir: str, batch_size: int = 50):
+    def __init__(self, text_dir: str, batch_size: int = 50, use_memory: bool = True):
         self.text_dir = Path(text_dir)
         self.batch_size = batch_size
-        self.translator = HTMLTranslator(TRANSLATION_GLOSSARY)
         self.progress_file = Path('translation_progress_v2.json')
+        self.memory_file = Path('translation_memory.json.gz')
+        # Glossary output stored under another glossary revision is dropped on load
+        self.memory = (TranslationMemory.load(self.memory_file,
+                                              glossary_version=glossary_version(TRANSLATION_GLOSSARY))
+                       if use_memory else None)
+        self.translator = HTMLTranslator(TRANSLATION_GLOSSARY, self.memory)
 
     def get_all_pages(self) -> List[Path]:
         """Get all English HTML pages"""
         pages = []
         for html_file in sorted(self.text_dir.glob('page_*.html')):
-            if '_ro' not in html_file.name:
+            if page_language_from_name(html_file.name) == 'en':
                 pages.append(html_file)
         return pages
 
@@ -391,17 +422,16 @@ class BatchProcessor:
             batch_count = 0
             for page_file in batch_pages:
                 try:
-                    match = re.search(r'page_(\d+)', page_file.name)
-                    if not match:
+                    page_num = page_number_from_name(page_file.name)
+                    if page_num is None:
                         continue
 
-                    page_num = int(match.group(1))
-
                     # Check if already translated
                     output_filename = page_file.name.replace('.html', '_ro.html')
                     output_path = self.text_dir / output_filename
 
-                    if output_path.exists() and page_file.name in progress['translated']:
+                    if (translated_page_exists(self.text_dir, page_num, 'ro')
+                            and page_file.name in progress['translated']):
                         print(f"   ✓ p{page_num:03d} (cached)")
                         batch_count += 1
                         total_processed += 1
@@ -433,6 +463,8 @@ class BatchProcessor:
 
             # Save after each batch
             self.save_progress(progress)
+            if self.memory is not None:
+                self.memory.save(self.memory_file)
             print(f"\n   ✅ {batch_count} pages done. Total: {total_processed}/{len(pages)}\n")
 
         # Summary
@@ -443,6 +475,325 @@ class BatchProcessor:
         print(f"   ✗ Failed: {len(progress['failed'])} pages")
         success_rate = (len(progress['translated']) / len(pages) * 100) if pages else 0
         print(f"   📊 Success rate: {success_rate:.1f}%")
+        self.print_memory_stats()
+        print(f"{'='*75}\n")
+
+    def print_memory_stats(self):
+        if self.memory is None:
+            return
+        stats = self.memory.stats
+        if self.memory.dropped:
+            print(f"   🧠 Glossary changed: dropped {self.memory.dropped} machine-translated segments")
+        print(f"   🧠 Memory: {stats['exact']} exact, {stats['fuzzy']} fuzzy, {stats['miss']} new segments "
+              f"({stats['sentences_reused']} sentences reused, {stats['sentences_translated']} re-translated)")
+
+# ============================================================================
+# DISTRIBUTED SHARDING (lease files on a shared filesystem)
+# ============================================================================
+
+def write_json_atomic(path: Path, data):
+    """Write JSON via a temp file and rename so readers never see partial files"""
+    tmp_path = path.with_name(f'.{path.name}.{uuid.uuid4().hex}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class LeaseManager:
+    """Exclusive, expiring claims on shards through O_EXCL lease files
+
+    Expiry uses wall-clock time, so hosts sharing the directory need
+    roughly synchronised clocks (well within the lease TTL). A lease is
+    only taken over once it has been expired for a grace period, while
+    its holder stops renewing as soon as it expires, so a holder that is
+    late renewing cannot overwrite the lease of the worker taking over.
+    """
+
+    def __init__(self, lease_dir: Path, worker_id: str, ttl: float = 120.0):
+        self.lease_dir = Path(lease_dir)
+        self.lease_dir.mkdir(parents=True, exist_ok=True)
+        self.worker_id = worker_id
+        self.ttl = ttl
+        self.grace = ttl / 4
+
+    def lease_path(self, shard_id: int) -> Path:
+        return self.lease_dir / f'shard_{shard_id:04d}.lease'
+
+    def read_lease(self, shard_id: int) -> Optional[Dict]:
+        try:
+            with open(self.lease_path(shard_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def try_claim(self, shard_id: int) -> bool:
+        """Claim a shard, taking over the lease if its holder let it expire"""
+        path = self.lease_path(shard_id)
+        if self._create(path, shard_id):
+            return True
+
+        try:
+            observed = path.stat()
+        except OSError:
+            # Released in the meantime; the next scan can claim it
+            return False
+        lease = self.read_lease(shard_id)
+        if lease is None:
+            # Holder may be mid-write; only treat it as stale once old enough
+            expired = time.time() - observed.st_mtime > self.ttl + self.grace
+        else:
+            expired = lease.get('expires', 0) + self.grace < time.time()
+        if not expired:
+            return False
+
+        tombstone = self._move_aside(path, observed)
+        if tombstone is None:
+            return False
+        os.unlink(tombstone)
+        return self._create(path, shard_id)
+
+    def renew(self, shard_id: int) -> bool:
+        """Extend our lease; False means it expired or was lost to another worker"""
+        path = self.lease_path(shard_id)
+        lease = self.read_lease(shard_id)
+        if not lease or lease.get('worker') != self.worker_id:
+            return False
+        if lease.get('expires', 0) <= time.time():
+            # Others may already be taking it over; writing now could clobber them
+            return False
+        body = self._lease_body(shard_id)
+        write_json_atomic(path, body)
+        # Confirm nobody replaced the lease while we were writing
+        return self.read_lease(shard_id) == body
+
+    def release(self, shard_id: int):
+        path = self.lease_path(shard_id)
+        try:
+            observed = path.stat()
+        except OSError:
+            return
+        lease = self.read_lease(shard_id)
+        if lease and lease.get('worker') == self.worker_id:
+            tombstone = self._move_aside(path, observed)
+            if tombstone is not None:
+                os.unlink(tombstone)
+
+    def _move_aside(self, path: Path, observed: os.stat_result) -> Optional[Path]:
+        """Atomically take the lease file out of place if it is still the one observed
+
+        Rename is atomic, so exactly one worker moves a given file aside.
+        If the moved file is not the one we inspected (a newer lease was
+        written in between), it is put back and None is returned. Linking
+        it back fails rather than overwriting if a lease was created in
+        the meantime.
+        """
+        tombstone = path.with_name(f'{path.name}.{uuid.uuid4().hex}.stale')
+        try:
+            os.rename(path, tombstone)
+        except OSError:
+            return None
+        moved = tombstone.stat()
+        if (moved.st_ino, moved.st_mtime_ns, moved.st_size) == \
+                (observed.st_ino, observed.st_mtime_ns, observed.st_size):
+            return tombstone
+        try:
+            os.link(tombstone, path)
+        except OSError:
+            pass
+        os.unlink(tombstone)
+        return None
+
+    def _lease_body(self, shard_id: int) -> Dict:
+        return {
+            'worker': self.worker_id,
+            'shard': shard_id,
+            'expires': time.time() + self.ttl,
+        }
+
+    def _create(self, path: Path, shard_id: int) -> bool:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self._lease_body(shard_id), f)
+        return True
+
+
+class ShardedBatchProcessor(BatchProcessor):
+    """Cooperating workers on several hosts split pages through shard leases
+
+    Each shard is a contiguous range of batch_size pages. A worker claims a
+    shard, translates it while renewing the lease, then records the result
+    in results/shard_XXXX.json. Shards whose holder crashed become claimable
+    once the lease expires. When every shard has a result, the results are
+    merged into the single progress manifest.
+    """
+
+    def __init__(self, text_dir: str, batch_size: int = 50, coord_dir: str = 'translation_shards',
+                 worker_id: Optional[str] = None, lease_ttl: float = 120.0, use_memory: bool = True):
+        # Workers read the shared memory but never write it back, so they
+        # cannot overwrite each other's additions
+        super().__init__(text_dir, batch_size, use_memory)
+        self.coord_dir = Path(coord_dir)
+        self.results_dir = self.coord_dir / 'results'
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+        self.leases = LeaseManager(self.coord_dir / 'leases', self.worker_id, lease_ttl)
+
+    def result_path(self, shard_id: int) -> Path:
+        return self.results_dir / f'shard_{shard_id:04d}.json'
+
+    def reset(self) -> int:
+        """Start a new round by removing shard results and leases
+
+        Results persist after a round completes, so later workers would
+        otherwise find every shard done and merge the old results again.
+        Refuses while any lease is live, since a running worker would
+        still publish into the new round. Returns the results removed.
+        """
+        leases = sorted(self.leases.lease_dir.glob('shard_*.lease*'))
+        for path in leases:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    lease = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if lease.get('expires', 0) > time.time():
+                raise RuntimeError(f"{path.name} is held by {lease.get('worker')}; "
+                                   f"wait for running workers to finish")
+        results = list(self.results_dir.glob('shard_*.json'))
+        for path in results + leases:
+            path.unlink(missing_ok=True)
+        return len(results)
+
+    def shards(self, pages: List[Path]) -> List[List[Path]]:
+        return [pages[i:i + self.batch_size] for i in range(0, len(pages), self.batch_size)]
+
+    def translate_shard(self, shard_id: int, shard_pages: List[Path], progress: Dict) -> Optional[Dict]:
+        """Translate one claimed shard; None if the lease was lost midway"""
+        result = {'worker': self.worker_id, 'translated': [], 'failed': []}
+        last_renewal = time.time()
+
+        for page_file in shard_pages:
+            if time.time() - last_renewal > self.leases.ttl / 3:
+                if not self.leases.renew(shard_id):
+                    print(f"   ⚠️ Lost lease on shard {shard_id}, abandoning it")
+                    return None
+                last_renewal = time.time()
+
+            page_num = page_number_from_name(page_file.name)
+            if page_num is None:
+                continue
+            output_path = self.text_dir / page_file.name.replace('.html', '_ro.html')
+
+            if (translated_page_exists(self.text_dir, page_num, 'ro')
+                    and page_file.name in progress['translated']):
+                result['translated'].append(page_file.name)
+                continue
+
+            try:
+                with open(page_file, 'r', encoding='utf-8') as f:
+                    english_html = f.read()
+                romanian_html = self.translator.translate_page(english_html, page_num)
+                if romanian_html:
+                    tmp_path = output_path.with_name(f'.{output_path.name}.{self.worker_id}.tmp')
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        f.write(romanian_html)
+                    os.replace(tmp_path, output_path)
+                    result['translated'].append(page_file.name)
+                else:
+                    result['failed'].append(page_file.name)
+            except Exception as e:
+                result['failed'].append(page_file.name)
+                print(f"   ✗ p{page_num:03d}: {str(e)[:30]}")
+
+        # Final check: a worker that overran its lease must not publish
+        if not self.leases.renew(shard_id):
+            print(f"   ⚠️ Lost lease on shard {shard_id}, abandoning it")
+            return None
+        return result
+
+    def merge_results(self, pages: List[Path], shard_count: int, progress: Dict) -> bool:
+        """Merge shard results into the progress manifest once all are in"""
+        results = []
+        for shard_id in range(shard_count):
+            try:
+                with open(self.result_path(shard_id), 'r', encoding='utf-8') as f:
+                    results.append(json.load(f))
+            except (OSError, ValueError):
+                return False
+
+        order = {page.name: idx for idx, page in enumerate(pages)}
+        translated = set()
+        failed = set()
+        for result in results:
+            translated.update(result['translated'])
+            failed.update(result['failed'])
+        failed -= translated
+
+        # Deterministic output, so concurrent merges write identical manifests
+        merged = {
+            'translated': sorted(translated, key=lambda name: order.get(name, len(order))),
+            'failed': sorted(failed, key=lambda name: order.get(name, len(order))),
+        }
+        write_json_atomic(self.progress_file, merged)
+        progress.update(merged)
+        return True
+
+    def process_batches(self):
+        """Claim and translate shards until none are left, then merge"""
+        pages = self.get_all_pages()
+        progress = self.load_progress()
+        shards = self.shards(pages)
+
+        print(f"\n{'='*75}")
+        print(f"📖 GUNS, GERMS & STEEL - ROMANIAN TRANSLATION v2 (SHARDED)")
+        print(f"{'='*75}")
+        print(f"🖥️  Worker: {self.worker_id}")
+        print(f"📊 Total pages: {len(pages)} in {len(shards)} shards of {self.batch_size}")
+        print(f"   Coordination dir: {self.coord_dir}\n")
+
+        completed = 0
+        while True:
+            pending = [i for i in range(len(shards)) if not self.result_path(i).exists()]
+            if not pending:
+                break
+
+            claimed = False
+            for shard_id in pending:
+                if self.result_path(shard_id).exists() or not self.leases.try_claim(shard_id):
+                    continue
+                claimed = True
+                # Another worker may have finished it between our check and claim
+                if self.result_path(shard_id).exists():
+                    self.leases.release(shard_id)
+                    continue
+
+                shard_pages = shards[shard_id]
+                print(f"🔄 Shard {shard_id + 1}/{len(shards)} | "
+                      f"{shard_pages[0].name} - {shard_pages[-1].name}")
+                result = self.translate_shard(shard_id, shard_pages, progress)
+                if result is not None:
+                    write_json_atomic(self.result_path(shard_id), result)
+                    completed += 1
+                    print(f"   ✅ {len(result['translated'])} translated, {len(result['failed'])} failed\n")
+                self.leases.release(shard_id)
+
+            if not claimed:
+                # Everything left is leased by live workers; wait for them or their expiry
+                time.sleep(min(5.0, self.leases.ttl / 4))
+
+        merged = self.merge_results(pages, len(shards), progress)
+
+        print("\n" + "="*75)
+        print(f"✅ ALL SHARDS COMPLETE! (this worker: {completed})")
+        print(f"{'='*75}")
+        if merged:
+            print(f"   ✓ Translated: {len(progress['translated'])}/{len(pages)} pages")
+            print(f"   ✗ Failed: {len(progress['failed'])} pages")
+            print(f"   💾 Manifest: {self.progress_file}")
+        self.print_memory_stats()
         print(f"{'='*75}\n")
 
 # ============================================================================
@@ -450,5 +801,34 @@ class BatchProcessor:
 # ============================================================================
 
 if __name__ == '__main__':
-    processor = BatchProcessor('text', batch_size=50)
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Translate all pages to Romanian')
+    parser.add_argument('--worker', action='store_true',
+                        help='Run as one of several cooperating workers sharing a directory')
+    parser.add_argument('--coord-dir', default='translation_shards',
+                        help='Shared directory holding leases and shard results')
+    parser.add_argument('--worker-id', help='Unique worker name (default: host-pid)')
+    parser.add_argument('--lease-ttl', type=float, default=120.0,
+                        help='Seconds before an unrenewed lease can be taken over')
+    parser.add_argument('--reset', action='store_true',
+                        help='With --worker: clear shard results and leases to start a new round')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Translate every segment from scratch, bypassing the translation memory')
+    args = parser.parse_args()
+
+    if args.worker:
+        processor = ShardedBatchProcessor('text', batch_size=50, coord_dir=args.coord_dir,
+                                          worker_id=args.worker_id, lease_ttl=args.lease_ttl,
+                                          use_memory=not args.no_memory)
+        if args.reset:
+            try:
+                removed = processor.reset()
+            except RuntimeError as e:
+                parser.error(str(e))
+            print(f"🧹 Started a new round: removed {removed} shard results from {args.coord_dir}")
+    elif args.reset:
+        parser.error('--reset only applies to --worker runs')
+    else:
+        processor = BatchProcessor('text', batch_size=50, use_memory=not args.no_memory)
     processor.process_batches()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fuzzy Translation Memory
+MinHash LSH lookup of near-duplicate segments, reusing stored translations
+Uses only built-in Python libraries - no external dependencies
+"""
+
+import gzip
+import json
+import os
+import random
+import re
+import zlib
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+MEMORY_VERSION = 1
+NUM_PERM = 32           # MinHash signature length
+BANDS = 8               # LSH bands of NUM_PERM // BANDS rows each
+SHINGLE_SIZE = 3        # word n-grams
+SIMILARITY_THRESHOLD = 0.8
+MAX_CANDIDATES = 8      # candidates verified exactly per lookup
+
+# Universal hashing (a * x + b) mod P over a Mersenne prime
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(MEMORY_VERSION)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+# Splits after sentence punctuation and keeps the separator
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])(\s+)')
+
+
+def normalize(text: str) -> str:
+    """Whitespace-insensitive key for exact matches"""
+    return ' '.join(text.split())
+
+
+def tokens(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def shingles(words: List[str]) -> set:
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set: set) -> Tuple[int, ...]:
+    """MinHash signature; crc32 is stable across runs, unlike hash()"""
+    hashes = [zlib.crc32(s.encode('utf-8')) for s in shingle_set]
+    if not hashes:
+        return tuple([_MERSENNE_PRIME] * NUM_PERM)
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def split_sentences(text: str) -> List[str]:
+    """Alternating [sentence, separator, sentence, ...]"""
+    return SENTENCE_PATTERN.split(text)
+
+# ============================================================================
+# TRANSLATION MEMORY
+# ============================================================================
+
+class TranslationMemory:
+    """Source/target segment pairs with exact and near-duplicate lookup
+
+    Near duplicates are found through banded MinHash LSH: a segment is only
+    compared against segments sharing at least one band, so a lookup costs
+    a few dict probes plus MAX_CANDIDATES verifications regardless of how
+    many segments are stored.
+
+    Segments produced by translate() are marked as machine output and tied
+    to glossary_version; human translations (seed_from_pages) are not.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, glossary_version: Optional[str] = None):
+        self.threshold = threshold
+        self.glossary_version = glossary_version
+        self.dropped = 0
+        self.sources: List[str] = []
+        self.targets: List[str] = []
+        self.machine: List[bool] = []
+        self.signatures: List[Tuple[int, ...]] = []
+        self.exact: Dict[str, int] = {}
+        self.bands: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(BANDS)]
+        self.stats = {'exact': 0, 'fuzzy': 0, 'miss': 0,
+                      'sentences_reused': 0, 'sentences_translated': 0}
+
+    def __len__(self):
+        return len(self.sources)
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        rows = NUM_PERM // BANDS
+        for band in range(BANDS):
+            yield band, signature[band * rows:(band + 1) * rows]
+
+    def add(self, source: str, target: str, signature: Optional[Tuple[int, ...]] = None,
+            machine: bool = False):
+        """Store a pair; a repeated source keeps the newest translation
+
+        Machine output never replaces a human translation of the same source.
+        """
+        key = normalize(source)
+        if not key:
+            return
+        if key in self.exact:
+            segment_id = self.exact[key]
+            if machine and not self.machine[segment_id]:
+                return
+            self.targets[segment_id] = target
+            self.machine[segment_id] = machine
+            return
+
+        if signature is None:
+            signature = minhash(shingles(tokens(source)))
+        segment_id = len(self.sources)
+        self.sources.append(source)
+        self.targets.append(target)
+        self.machine.append(machine)
+        self.signatures.append(signature)
+        self.exact[key] = segment_id
+        for band, band_key in self._band_keys(signature):
+            self.bands[band].setdefault(band_key, []).append(segment_id)
+
+    def lookup(self, source: str) -> Optional[Tuple[int, float]]:
+        """Best stored segment as (segment_id, similarity), or None"""
+        segment_id = self.exact.get(normalize(source))
+        if segment_id is not None:
+            return segment_id, 1.0
+
+        words = tokens(source)
+        signature = minhash(shingles(words))
+        hits: Dict[int, int] = {}
+        for band, band_key in self._band_keys(signature):
+            for candidate in self.bands[band].get(band_key, ()):
+                hits[candidate] = hits.get(candidate, 0) + 1
+        if not hits:
+            return None
+
+        # More shared bands means higher estimated Jaccard; verify the best few
+        best = None
+        for candidate in sorted(hits, key=hits.get, reverse=True)[:MAX_CANDIDATES]:
+            similarity = SequenceMatcher(None, words, tokens(self.sources[candidate]),
+                                         autojunk=False).ratio()
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
+
+    def translate(self, source: str, translate_fn: Callable[[str], str]) -> str:
+        """Translate through the memory, falling back to translate_fn
+
+        An exact match returns the stored translation. A near match whose
+        stored source and translation split into the same number of
+        sentences reuses the translation of every unchanged sentence and
+        only passes the changed sentences to translate_fn. The result is
+        stored for later lookups.
+        """
+        match = self.lookup(source)
+        if match is None:
+            self.stats['miss'] += 1
+            target = translate_fn(source)
+        elif normalize(self.sources[match[0]]) == normalize(source):
+            self.stats['exact'] += 1
+            return self.targets[match[0]]
+        else:
+            # Word-level similarity ignores case and punctuation, so even a
+            # 1.0 match goes through sentence patching
+            self.stats['fuzzy'] += 1
+            target = self._patch(source, match[0], translate_fn)
+
+        self.add(source, target, machine=True)
+        return target
+
+    def _patch(self, source: str, segment_id: int, translate_fn: Callable[[str], str]) -> str:
+        stored_source = split_sentences(self.sources[segment_id])[::2]
+        stored_target = split_sentences(self.targets[segment_id])[::2]
+        if len(stored_source) != len(stored_target):
+            # No sentence alignment to reuse; translate the whole segment
+            self.stats['sentences_translated'] += 1
+            return translate_fn(source)
+
+        aligned = {normalize(s): t for s, t in zip(stored_source, stored_target)}
+        parts = split_sentences(source)
+        for i in range(0, len(parts), 2):
+            reused = aligned.get(normalize(parts[i]))
+            if reused is not None:
+                parts[i] = reused
+                self.stats['sentences_reused'] += 1
+            else:
+                parts[i] = translate_fn(parts[i])
+                self.stats['sentences_translated'] += 1
+        return ''.join(parts)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path):
+        data = {
+            'version': MEMORY_VERSION,
+            'num_perm': NUM_PERM,
+            'glossary_version': self.glossary_version,
+            'segments': [[s, t] for s, t in zip(self.sources, self.targets)],
+            'machine': [int(flag) for flag in self.machine],
+            'signatures': [list(sig) for sig in self.signatures],
+        }
+        tmp_path = path.with_name(path.name + '.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, threshold: float = SIMILARITY_THRESHOLD,
+             glossary_version: Optional[str] = None) -> 'TranslationMemory':
+        """Load a memory; with glossary_version, drop machine output of other glossaries
+
+        Files written before segments were marked count as all machine
+        output; re-run --seed to restore the human translations.
+        """
+        memory = cls(threshold, glossary_version)
+        if not path.exists():
+            return memory
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if glossary_version is None:
+            memory.glossary_version = data.get('glossary_version')
+        stale = glossary_version is not None and data.get('glossary_version') != glossary_version
+        machine = data.get('machine') or [1] * len(data['segments'])
+        # Signatures are only valid for the hashing scheme that made them
+        reuse = data.get('version') == MEMORY_VERSION and data.get('num_perm') == NUM_PERM
+        for i, (source, target) in enumerate(data['segments']):
+            if stale and machine[i]:
+                memory.dropped += 1
+                continue
+            memory.add(source, target, tuple(data['signatures'][i]) if reuse else None,
+                       machine=bool(machine[i]))
+        return memory
+
+# ============================================================================
+# SEEDING FROM EXISTING TRANSLATIONS
+# ============================================================================
+
+def seed_from_pages(memory: TranslationMemory, text_dir: str = 'text') -> int:
+    """Add aligned EN/RO paragraphs and commentary from translated pages"""
+    from page_model import PageStore
+
+    store = PageStore(text_dir)
+    english = store.load_map('en')
+    romanian = store.load_map('ro')
+    before = len(memory)
+
+    for number, page in sorted(english.items()):
+        translated = romanian.get(number)
+        if translated is None:
+            continue
+        pairs = []
+        if len(page.paragraphs) == len(translated.paragraphs):
+            pairs += zip(page.paragraphs, translated.paragraphs)
+        if len(page.commentary) == len(translated.commentary):
+            for section, section_ro in zip(page.commentary, translated.commentary):
+                source_parts = section.text.split('\n')
+                target_parts = section_ro.text.split('\n')
+                if len(source_parts) == len(target_parts):
+                    pairs += zip(source_parts, target_parts)
+        for source, target in pairs:
+            # Untranslated copies carry no information
+            if source != target:
+                memory.add(source, target)
+    return len(memory) - before
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Build or query the fuzzy translation memory')
+    parser.add_argument('--memory', default='translation_memory.json.gz', help='Memory file')
+    parser.add_argument('--seed', action='store_true',
+                        help='Add aligned segments from existing text/*_ro.html pages')
+    parser.add_argument('--query', help='Show the closest stored segment for this text')
+    args = parser.parse_args()
+
+    path = Path(args.memory)
+    start = time.perf_counter()
+    memory = TranslationMemory.load(path)
+    print(f"🧠 {len(memory)} segments loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    if args.seed:
+        start = time.perf_counter()
+        added = seed_from_pages(memory)
+        memory.save(path)
+        print(f"🌱 Seeded {added} segments in {time.perf_counter() - start:.1f}s → {path}")
+
+    if args.query:
+        match = memory.lookup(args.query)
+        if match is None:
+            print("❌ No segment above the similarity threshold")
+        else:
+            segment_id, similarity = match
+            print(f"✅ Similarity {similarity:.2f}")
+            print(f"   EN: {memory.sources[segment_id]}")
+            print(f"   RO: {memory.targets[segment_id]}")